@@ -1,38 +1,114 @@
 #api client with corrected RxNorm endpoints
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import functools
 import json
+import logging
+import orjson
 import sys
+import threading
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 
 OPENFDA_API_KEY = os.environ.get("OPENFDA_API_KEY")
 DRUG_LABEL_ENDPOINT = "https://api.fda.gov/drug/label.json"
 FAERS_ENDPOINT = "https://api.fda.gov/drug/event.json"
 RXNAV_BASE_URL = "https://rxnav.nlm.nih.gov/REST"
 
+logger = logging.getLogger(__name__)
+
+def _retry(status_forcelist: tuple) -> Retry:
+    return Retry(total=3, backoff_factor=0.3, status_forcelist=status_forcelist,
+                 allowed_methods={"GET"}, raise_on_status=False)
+
+# One keep-alive session for RxNav and openFDA. Transient 429/5xx responses are retried with
+# exponential backoff (honoring Retry-After); once retries run out the last response is returned
+# so callers still see its status code.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    max_retries=_retry((429, 500, 502, 503, 504))
+))
+# FAERS requests must each take a _faers_bucket token, so its adapter leaves 429s alone and
+# get_adverse_events retries them through the bucket
+_SESSION.mount(FAERS_ENDPOINT, HTTPAdapter(pool_maxsize=20, max_retries=_retry((500, 502, 503, 504))))
+
+def _loads(response) -> Any:
+    """Decode a JSON response body with orjson (its JSONDecodeError subclasses json.JSONDecodeError)"""
+    return orjson.loads(response.content)
+
 # Rate limiting for FAERS API
-last_faers_request = 0
 FAERS_MIN_INTERVAL = 0.25  # 4 requests per second to stay under 240/minute
+FAERS_BURST = 4  # requests allowed back-to-back before callers are paced
+
+class _TokenBucket:
+    """Thread-safe token bucket: bursts up to capacity, then paces callers at rate tokens/second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Take the token now, even into debt, so concurrent callers queue up behind each other
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
 
-def get_rxcui_for_drug(drug_name: str) -> str:
+_faers_bucket = _TokenBucket(FAERS_BURST, 1 / FAERS_MIN_INTERVAL)
+FAERS_MAX_RETRY_AFTER = 10.0  # longest Retry-After wait honored on a 429
+
+def _faers_get(params: Dict[str, Any]) -> requests.Response:
+    """GET the FAERS endpoint, pacing every attempt (including the retry after a 429) through _faers_bucket"""
+    _faers_bucket.acquire()
+    response = _SESSION.get(FAERS_ENDPOINT, params=params, timeout=15)
+    
+    if response.status_code == 429:
+        # Rate limited, wait and retry once
+        try:
+            delay = min(float(response.headers.get("Retry-After", 1)), FAERS_MAX_RETRY_AFTER)
+        except ValueError:
+            delay = 1
+        time.sleep(max(delay, 0))
+        _faers_bucket.acquire()
+        response = _SESSION.get(FAERS_ENDPOINT, params=params, timeout=15)
+    return response
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_rxcui(drug_name: str) -> Optional[str]:
+    """RxCUI for an already normalized name. Failures raise, so only real answers are cached"""
+    # Use correct endpoint: findRxcuiByString
+    url = f"{RXNAV_BASE_URL}/rxcui.json"
+    params = {"name": drug_name, "search": "2"}  # search=2 is normalized search
+    
+    response = _SESSION.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    data = _loads(response)
+    
+    if data.get("idGroup") and data["idGroup"].get("rxnormId"):
+        return data["idGroup"]["rxnormId"][0]
+    
+    return None
+
+def get_rxcui_for_drug(drug_name: str) -> Optional[str]:
     """Get RxCUI identifier for a drug name using correct RxNorm API"""
     try:
-        # Use correct endpoint: findRxcuiByString
-        url = f"{RXNAV_BASE_URL}/rxcui.json"
-        params = {"name": drug_name, "search": "2"}  # search=2 is normalized search
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("idGroup") and data["idGroup"].get("rxnormId"):
-            return data["idGroup"]["rxnormId"][0]
-        
-        return None
+        # RxNorm's normalized search ignores case, so equivalent spellings share a cache entry
+        return _lookup_rxcui(drug_name.strip().lower())
         
     except Exception as e:
-        print(f"rxcui lookup failed for {drug_name}: {str(e)}", file=sys.stderr)
+        logger.debug("rxcui lookup failed for %s: %s", drug_name, e)
         return None
 
 def get_drug_interactions_via_rxclass(rxcui: str) -> Dict[str, Any]:
@@ -42,9 +118,9 @@ def get_drug_interactions_via_rxclass(rxcui: str) -> Dict[str, Any]:
         url = f"https://rxnav.nlm.nih.gov/REST/rxclass/class/byRxcui.json"
         params = {"rxcui": rxcui, "relaSource": "MEDRT"}
         
-        response = requests.get(url, params=params, timeout=15)
+        response = _SESSION.get(url, params=params, timeout=15)
         response.raise_for_status()
-        data = response.json()
+        data = _loads(response)
         
         return {
             "drug_classes": data.get("rxclassDrugInfoList", {}).get("rxclassDrugInfo", []),
@@ -55,46 +131,59 @@ def get_drug_interactions_via_rxclass(rxcui: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"RxClass lookup failed: {str(e)}"}
 
+def _drug_ingredient_info(drug: str) -> Optional[Dict[str, Any]]:
+    """RxCUI and active ingredients for one drug, or None when RxNorm doesn't know the name"""
+    rxcui = get_rxcui_for_drug(drug)
+    if not rxcui:
+        return None
+    
+    # OPTIMAL: Use getRelatedByType to get ONLY ingredients (TTY=IN)
+    url = f"{RXNAV_BASE_URL}/rxcui/{rxcui}/related.json"
+    params = {"tty": "IN"}  # TTY=IN means ingredients only
+    
+    try:
+        response = _SESSION.get(url, params=params, timeout=15)
+        response.raise_for_status()
+        data = _loads(response)
+        
+        # Extract ingredient names (much smaller response)
+        concept_groups = (data.get("relatedGroup") or {}).get("conceptGroup") or ()
+        ingredients = [
+            concept.get("name", "Unknown")
+            for group in concept_groups if group.get("tty") == "IN"
+            for concept in group.get("conceptProperties") or ()
+        ]
+        
+        return {
+            "rxcui": rxcui,
+            "ingredients": ingredients
+        }
+        
+    except Exception as e:
+        # Fallback: just store the RxCUI if ingredient lookup fails
+        return {
+            "rxcui": rxcui, 
+            "ingredients": [],
+            "note": f"Could not retrieve ingredients: {str(e)}"
+        }
+
+# Drugs resolved at once in check_drug_interactions
+_INTERACTION_LOOKUP_WORKERS = 8
+
 def check_drug_interactions(drug1: str, drug2: str, additional_drugs: List[str] = []) -> Dict[str, Any]:
     """Enhanced drug interaction checker using optimal RxNorm API methods"""
     try:
         all_drugs = [drug1, drug2] + additional_drugs
         drug_info = {}
         
-        for drug in all_drugs:
-            rxcui = get_rxcui_for_drug(drug)
-            if rxcui:
-                # OPTIMAL: Use getRelatedByType to get ONLY ingredients (TTY=IN)
-                url = f"{RXNAV_BASE_URL}/rxcui/{rxcui}/related.json"
-                params = {"tty": "IN"}  # TTY=IN means ingredients only
-                
-                try:
-                    response = requests.get(url, params=params, timeout=15)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    # Extract ingredient names (much smaller response)
-                    ingredients = []
-                    if data.get("relatedGroup", {}).get("conceptGroup"):
-                        for group in data["relatedGroup"]["conceptGroup"]:
-                            if group.get("tty") == "IN" and group.get("conceptProperties"):
-                                for concept in group["conceptProperties"]:
-                                    ingredients.append(concept.get("name", "Unknown"))
-                    
-                    drug_info[drug] = {
-                        "rxcui": rxcui,
-                        "ingredients": ingredients
-                    }
-                    
-                except Exception as e:
-                    # Fallback: just store the RxCUI if ingredient lookup fails
-                    drug_info[drug] = {
-                        "rxcui": rxcui, 
-                        "ingredients": [],
-                        "note": f"Could not retrieve ingredients: {str(e)}"
-                    }
-            else:
+        # Resolve every drug concurrently; results come back in input order
+        with ThreadPoolExecutor(max_workers=min(_INTERACTION_LOOKUP_WORKERS, len(all_drugs))) as executor:
+            lookups = list(executor.map(_drug_ingredient_info, all_drugs))
+        
+        for drug, info in zip(all_drugs, lookups):
+            if info is None:
                 return {"error": f"Could not find RxCUI for drug: {drug}"}
+            drug_info[drug] = info
         
         # Analyze for interactions based on ingredients
         potential_interactions = []
@@ -157,13 +246,13 @@ def convert_drug_names(drug_name: str, conversion_type: str = "both") -> Dict[st
                 params['api_key'] = OPENFDA_API_KEY
             
             try:
-                response = requests.get(DRUG_LABEL_ENDPOINT, params=params, timeout=15)
+                response = _SESSION.get(DRUG_LABEL_ENDPOINT, params=params, timeout=15)
                 
                 if response.status_code == 404:
                     continue
                     
                 response.raise_for_status()
-                data = response.json()
+                data = _loads(response)
                 
                 if data.get("results"):
                     # Extract names from results
@@ -202,17 +291,12 @@ def convert_drug_names(drug_name: str, conversion_type: str = "both") -> Dict[st
     except Exception as e:
         return {"error": f"Error converting drug names: {str(e)}"}
 
+# Shared stand-in for FAERS reports without a patient section; only ever read
+_NO_PATIENT: Dict[str, Any] = {}
+
 def get_adverse_events(drug_name: str, time_period: str = "1year", severity_filter: str = "all") -> Dict[str, Any]:
     """Get FDA adverse event reports for a medication"""
-    global last_faers_request
-    
     try:
-        # Rate limiting for FAERS API
-        current_time = time.time()
-        time_since_last = current_time - last_faers_request
-        if time_since_last < FAERS_MIN_INTERVAL:
-            time.sleep(FAERS_MIN_INTERVAL - time_since_last)
-        
         # Build search parameters
         search_terms = [
             f'patient.drug.medicinalproduct:"{drug_name}"',
@@ -230,20 +314,13 @@ def get_adverse_events(drug_name: str, time_period: str = "1year", severity_filt
                 params['api_key'] = OPENFDA_API_KEY
             
             try:
-                response = requests.get(FAERS_ENDPOINT, params=params, timeout=15)
-                last_faers_request = time.time()
-                
-                if response.status_code == 429:
-                    # Rate limited, wait and retry once
-                    time.sleep(1)
-                    response = requests.get(FAERS_ENDPOINT, params=params, timeout=15)
-                    last_faers_request = time.time()
+                response = _faers_get(params)
                 
                 if response.status_code == 404:
                     continue
                 
                 response.raise_for_status()
-                data = response.json()
+                data = _loads(response)
                 
                 if data.get("results"):
                     # Process adverse events
@@ -251,21 +328,21 @@ def get_adverse_events(drug_name: str, time_period: str = "1year", severity_filt
                     serious_events = 0
                     
                     for result in data["results"]:
+                        patient = result.get("patient") or _NO_PATIENT
+                        
                         # Extract key information
                         event = {
                             "report_id": result.get("safetyreportid", "Unknown"),
                             "serious": result.get("serious", "Unknown"),
-                            "outcome": result.get("patient", {}).get("patientdeath", "Unknown"),
-                            "reactions": []
-                        }
-                        
-                        # Extract reactions
-                        if result.get("patient", {}).get("reaction"):
-                            for reaction in result["patient"]["reaction"]:
-                                event["reactions"].append({
+                            "outcome": patient.get("patientdeath", "Unknown"),
+                            "reactions": [
+                                {
                                     "term": reaction.get("reactionmeddrapt", "Unknown"),
                                     "outcome": reaction.get("reactionoutcome", "Unknown")
-                                })
+                                }
+                                for reaction in patient.get("reaction") or ()
+                            ]
+                        }
                         
                         events.append(event)
                         
@@ -4,7 +4,7 @@ Test the working OpenFDA drug shortages endpoint
 https://api.fda.gov/drug/shortages.json
 """
 
-import requests
+import httpx
 import json
 import os
 from dotenv import load_dotenv
@@ -14,6 +14,9 @@ load_dotenv()
 DRUG_SHORTAGES_ENDPOINT = "https://api.fda.gov/drug/shortages.json"
 OPENFDA_API_KEY = os.environ.get("OPENFDA_API_KEY")
 
+# One HTTP/2 keep-alive client for every probe below, so the TLS handshake happens once
+CLIENT = httpx.Client(http2=True, timeout=10)
+
 def test_working_endpoint():
     """Test the working shortages endpoint"""
     
@@ -31,7 +34,7 @@ def test_working_endpoint():
         params['api_key'] = OPENFDA_API_KEY
     
     try:
-        response = requests.get(DRUG_SHORTAGES_ENDPOINT, params=params, timeout=10)
+        response = CLIENT.get(DRUG_SHORTAGES_ENDPOINT, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -90,7 +93,7 @@ def test_drug_searches():
                 params['api_key'] = OPENFDA_API_KEY
             
             try:
-                response = requests.get(DRUG_SHORTAGES_ENDPOINT, params=params, timeout=10)
+                response = CLIENT.get(DRUG_SHORTAGES_ENDPOINT, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -128,7 +131,7 @@ def explore_fields():
         params['api_key'] = OPENFDA_API_KEY
     
     try:
-        response = requests.get(DRUG_SHORTAGES_ENDPOINT, params=params, timeout=10)
+        response = CLIENT.get(DRUG_SHORTAGES_ENDPOINT, params=params)
         
         if response.status_code == 200:
             data = response.json()
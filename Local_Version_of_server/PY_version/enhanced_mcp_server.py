@@ -3,7 +3,6 @@ import os
 from dotenv import load_dotenv
 import sys
 from typing import Dict, Any, Optional, List
-import asyncio
 
 from mcp.server.fastmcp import FastMCP
 import openfda_client
@@ -13,24 +12,22 @@ load_dotenv()
 mcp_app = FastMCP(
     name="EnhancedMedicationInformationService",
     version="0.3.0",
-    description="MCP server providing comprehensive medication info using openFDA with shortage data and analytics"
+    description="MCP server providing comprehensive medication info using openFDA with shortage data and analytics",
+    lifespan=openfda_client.client_lifespan
 )
 
-def get_medication_profile_logic(drug_identifier: str, identifier_type: str) -> Dict[str, Any]:
-    """Get complete drug profile including label and shortage information"""
-    # Get label information
-    label_info = openfda_client.fetch_drug_label_info(drug_identifier, identifier_type=identifier_type)
-
-    # Determine best search term for shortage lookup
+def choose_shortage_search_term(drug_identifier: str, label_info: Dict[str, Any]) -> str:
+    """Determine best search term for shortage lookup (the label's generic name when available)"""
     shortage_search_term = drug_identifier
     if label_info and not label_info.get("error") and "openfda" in label_info:
         generic_names = label_info["openfda"].get("generic_name")
         if generic_names and isinstance(generic_names, list) and len(generic_names) > 0:
             shortage_search_term = generic_names[0]
+    return shortage_search_term
 
-    # Get shortage information
-    shortage_info = openfda_client.fetch_drug_shortage_info(shortage_search_term)
-
+def build_medication_profile(drug_identifier: str, identifier_type: str, label_info: Dict[str, Any],
+                             shortage_search_term: str, shortage_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine fetched label and shortage information into a drug profile"""
     # Parse label information
     parsed_label_info = {}
     if label_info and not label_info.get("error"):
@@ -91,6 +88,13 @@ def get_medication_profile_logic(drug_identifier: str, identifier_type: str) ->
     
     return profile
 
+def get_medication_profile_logic(drug_identifier: str, identifier_type: str) -> Dict[str, Any]:
+    """Get complete drug profile including label and shortage information"""
+    label_info = openfda_client.fetch_drug_label_info(drug_identifier, identifier_type=identifier_type)
+    shortage_search_term = choose_shortage_search_term(drug_identifier, label_info)
+    shortage_info = openfda_client.fetch_drug_shortage_info(shortage_search_term)
+    return build_medication_profile(drug_identifier, identifier_type, label_info, shortage_search_term, shortage_info)
+
 @mcp_app.tool()
 async def get_medication_profile(
     drug_identifier: str,
@@ -99,8 +103,11 @@ async def get_medication_profile(
     """
     Get complete drug information including label and shortage status
     """
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, get_medication_profile_logic, drug_identifier, identifier_type)
+    label_info, shortage_search_term, shortage_info = await openfda_client.fetch_label_and_shortage_async(
+        drug_identifier, identifier_type, choose_shortage_search_term
+    )
+
+    return build_medication_profile(drug_identifier, identifier_type, label_info, shortage_search_term, shortage_info)
 
 @mcp_app.tool()
 async def search_drug_shortages(
@@ -110,8 +117,7 @@ async def search_drug_shortages(
     """
     Search for drug shortages using openFDA database
     """
-    loop = asyncio.get_event_loop()
-    shortage_info = await loop.run_in_executor(None, openfda_client.fetch_drug_shortage_info, search_term)
+    shortage_info = await openfda_client.fetch_drug_shortage_info_async(search_term)
     
     result = {
         "search_term": search_term,
@@ -129,8 +135,7 @@ async def get_shortage_search_guidance(
     """
     Get search guidance and tips for finding drug shortage information
     """
-    loop = asyncio.get_event_loop()
-    openfda_results = await loop.run_in_executor(None, openfda_client.fetch_drug_shortage_info, drug_name)
+    openfda_results = await openfda_client.fetch_drug_shortage_info_async(drug_name)
     
     guidance = {
         "drug_name": drug_name,
@@ -168,8 +173,7 @@ async def search_drug_recalls(
     """
     Search for drug recalls using openFDA enforcement database
     """
-    loop = asyncio.get_event_loop()
-    recall_info = await loop.run_in_executor(None, openfda_client.search_drug_recalls, search_term)
+    recall_info = await openfda_client.search_drug_recalls_async(search_term)
     
     return {
         "search_term": search_term,
@@ -186,8 +190,7 @@ async def get_drug_label_only(
     """
     Get only FDA label information for a drug
     """
-    loop = asyncio.get_event_loop()
-    label_info = await loop.run_in_executor(None, openfda_client.fetch_drug_label_info, drug_identifier, identifier_type)
+    label_info = await openfda_client.fetch_drug_label_info_async(drug_identifier, identifier_type)
     
     return {
         "drug_identifier": drug_identifier,
@@ -205,8 +208,7 @@ async def analyze_drug_market_trends(
     """
     Analyze drug shortage patterns and market trends
     """
-    loop = asyncio.get_event_loop()
-    trend_analysis = await loop.run_in_executor(None, openfda_client.analyze_drug_market_trends, drug_name, months_back)
+    trend_analysis = await openfda_client.analyze_drug_market_trends_async(drug_name, months_back)
     
     return {
         "drug_analyzed": drug_name,
@@ -230,8 +232,7 @@ async def batch_drug_analysis(
             "recommendation": "Split drug list into smaller batches for optimal performance"
         }
     
-    loop = asyncio.get_event_loop()
-    batch_results = await loop.run_in_executor(None, openfda_client.batch_drug_analysis, drug_list, include_trends)
+    batch_results = await openfda_client.batch_drug_analysis_async(drug_list, include_trends)
     
     return {
         "batch_analysis": batch_results,
@@ -7,33 +7,33 @@ import os
 import json
 from pathlib import Path
 
+# Possible config locations for Claude Desktop, expanded once at import
+_CANDIDATES = tuple(Path(p).expanduser() for p in (
+    "~/Library/Application Support/Claude/claude_desktop_config.json",
+    "~/.config/claude/claude_desktop_config.json",
+    "~/Library/Preferences/claude_desktop_config.json",
+    "~/.claude/claude_desktop_config.json",
+    "~/claude_desktop_config.json"
+))
+_DEFAULT_DIR = Path("~/Library/Application Support/Claude").expanduser()
+_DEFAULT_CONFIG = _DEFAULT_DIR / "claude_desktop_config.json"
+
 def find_claude_config():
     """Find all possible Claude Desktop config locations"""
     
     print("🔍 Searching for Claude Desktop Config Locations")
     print("=" * 50)
     
-    # Possible config locations for Claude Desktop
-    possible_locations = [
-        "~/Library/Application Support/Claude/claude_desktop_config.json",
-        "~/.config/claude/claude_desktop_config.json", 
-        "~/Library/Preferences/claude_desktop_config.json",
-        "~/.claude/claude_desktop_config.json",
-        "~/claude_desktop_config.json"
-    ]
-    
     found_configs = []
     
-    for location in possible_locations:
-        expanded_path = os.path.expanduser(location)
-        if os.path.exists(expanded_path):
-            found_configs.append(expanded_path)
-            print(f"Found config: {expanded_path}")
+    for config_path in _CANDIDATES:
+        if config_path.exists():
+            found_configs.append(str(config_path))
+            print(f"Found config: {config_path}")
             
             # Check if it has our server
             try:
-                with open(expanded_path, 'r') as f:
-                    config = json.load(f)
+                config = json.loads(config_path.read_bytes())
                 
                 if "mcp_servers" in config:
                     servers = config["mcp_servers"]
@@ -48,7 +48,7 @@ def find_claude_config():
             except Exception as e:
                 print(f"   Error reading config: {e}")
         else:
-            print(f"Not found: {location}")
+            print(f"Not found: {config_path}")
     
     if not found_configs:
         print("\nNo Claude Desktop config files found!")
@@ -60,13 +60,12 @@ def find_claude_config():
 def create_config():
     """Create a proper config file"""
     
-    config_dir = os.path.expanduser("~/Library/Application Support/Claude")
-    config_path = os.path.join(config_dir, "claude_desktop_config.json")
+    config_path = _DEFAULT_CONFIG
     
     print(f"\n📝 Creating config at: {config_path}")
     
     # Create directory if it doesn't exist
-    os.makedirs(config_dir, exist_ok=True)
+    _DEFAULT_DIR.mkdir(parents=True, exist_ok=True)
     
     config = {
   "mcpServers": {
@@ -78,11 +77,11 @@ def create_config():
 }
     
     try:
-        with open(config_path, 'w') as f:
+        with config_path.open('w') as f:
             json.dump(config, f, indent=2)
         print("Config file created!")
         print("🔄 Restart Claude Desktop now!")
-        return [config_path]
+        return [str(config_path)]
     except Exception as e:
         print(f"Error creating config: {e}")
         return []
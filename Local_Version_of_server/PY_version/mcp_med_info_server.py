@@ -2,8 +2,9 @@
 import os
 from dotenv import load_dotenv
 import sys
-from typing import Dict, Any, Optional
-import asyncio
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import logging
 
 # MCP SDK imports
 from mcp.server.fastmcp import FastMCP
@@ -14,35 +15,38 @@ import openfda_client
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Initialize FastMCP Application
 mcp_app = FastMCP(
     name="MedicationInformationService",
     version="0.1.0",
-    description="An MCP server that provides comprehensive information about medications using openFDA."
+    description="An MCP server that provides comprehensive information about medications using openFDA.",
+    lifespan=openfda_client.client_lifespan
 )
 
-def get_medication_profile_logic(drug_identifier: str, identifier_type: str) -> Dict[str, Any]:
+def choose_shortage_search_term(drug_identifier: str, label_info: Dict[str, Any]) -> str:
     """
-    Internal logic to fetch and combine drug label and shortage information.
+    Determine the best search term for shortage lookup (the label's generic name when available).
     """
-    print(f"MCP Server Logic: Request for drug: {drug_identifier}, type: {identifier_type}", file=sys.stderr)
-    sys.stderr.flush()
-
-    # Fetch label information
-    label_info = openfda_client.fetch_drug_label_info(drug_identifier, identifier_type=identifier_type)
-
-    # Determine the best search term for shortage lookup
     shortage_search_term = drug_identifier
     if label_info and not label_info.get("error") and "openfda" in label_info:
         generic_names = label_info["openfda"].get("generic_name")
         if generic_names and isinstance(generic_names, list) and len(generic_names) > 0:
             shortage_search_term = generic_names[0]
-            print(f"MCP Server Logic: Using generic name '{shortage_search_term}' for shortage lookup.", file=sys.stderr)
-            sys.stderr.flush()
-
-    # Fetch shortage information
-    shortage_info = openfda_client.fetch_drug_shortage_info(shortage_search_term)
+            logger.debug("MCP Server Logic: Using generic name '%s' for shortage lookup.", shortage_search_term)
+    return shortage_search_term
 
+def build_medication_profile(
+    drug_identifier: str,
+    identifier_type: str,
+    label_info: Dict[str, Any],
+    shortage_search_term: str,
+    shortage_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Combine fetched label and shortage information into the medication profile.
+    """
     # Parse and structure label information
     parsed_label_info = {}
     if label_info and not label_info.get("error"):
@@ -99,10 +103,38 @@ def get_medication_profile_logic(drug_identifier: str, identifier_type: str) ->
         else:
             profile["overall_status"] = "Successfully retrieved label info - no current shortage found"
     
-    print(f"MCP Server Logic: Profile assembled for {drug_identifier}.", file=sys.stderr)
-    sys.stderr.flush()
+    logger.debug("MCP Server Logic: Profile assembled for %s.", drug_identifier)
     return profile
 
+def get_medication_profile_logic(drug_identifier: str, identifier_type: str) -> Dict[str, Any]:
+    """
+    Internal logic to fetch and combine drug label and shortage information.
+    """
+    logger.debug("MCP Server Logic: Request for drug: %s, type: %s", drug_identifier, identifier_type)
+
+    # Fetch label information
+    label_info = openfda_client.fetch_drug_label_info(drug_identifier, identifier_type=identifier_type)
+
+    # Fetch shortage information
+    shortage_search_term = choose_shortage_search_term(drug_identifier, label_info)
+    shortage_info = openfda_client.fetch_drug_shortage_info(shortage_search_term)
+
+    return build_medication_profile(drug_identifier, identifier_type, label_info, shortage_search_term, shortage_info)
+
+_PROFILE_WORKERS = 8
+
+def get_medication_profiles_logic(drug_identifiers: List[str], identifier_type: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Batch form of get_medication_profile_logic: builds the profiles on a thread pool so the
+    per-drug openFDA requests overlap. Returns profiles keyed by drug; duplicates are fetched once.
+    """
+    drugs = list(dict.fromkeys(drug_identifiers))
+    if not drugs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(_PROFILE_WORKERS, len(drugs))) as pool:
+        profiles = pool.map(lambda drug: get_medication_profile_logic(drug, identifier_type), drugs)
+        return dict(zip(drugs, profiles))
+
 # Define MCP Tools
 @mcp_app.tool()
 async def get_medication_profile(
@@ -125,9 +157,13 @@ async def get_medication_profile(
         A dictionary containing structured medication information including label details
         and shortage status.
     """
-    # Run the synchronous function in a thread to avoid blocking
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, get_medication_profile_logic, drug_identifier, identifier_type)
+    logger.debug("MCP Server Logic: Request for drug: %s, type: %s", drug_identifier, identifier_type)
+
+    label_info, shortage_search_term, shortage_info = await openfda_client.fetch_label_and_shortage_async(
+        drug_identifier, identifier_type, choose_shortage_search_term
+    )
+
+    return build_medication_profile(drug_identifier, identifier_type, label_info, shortage_search_term, shortage_info)
 
 @mcp_app.tool()
 async def search_drug_shortages(
@@ -145,11 +181,9 @@ async def search_drug_shortages(
     Returns:
         A dictionary containing current shortage information from OpenFDA.
     """
-    print(f"MCP Server: Searching OpenFDA for shortages of: {search_term}", file=sys.stderr)
-    sys.stderr.flush()
+    logger.debug("MCP Server: Searching OpenFDA for shortages of: %s", search_term)
     
-    loop = asyncio.get_event_loop()
-    shortage_info = await loop.run_in_executor(None, openfda_client.fetch_drug_shortage_info, search_term)
+    shortage_info = await openfda_client.fetch_drug_shortage_info_async(search_term)
     
     result = {
         "search_term": search_term,
@@ -175,11 +209,9 @@ async def get_drug_label_only(
     Returns:
         A dictionary containing only the drug label information.
     """
-    print(f"MCP Server: Fetching label only for: {drug_identifier}", file=sys.stderr)
-    sys.stderr.flush()
+    logger.debug("MCP Server: Fetching label only for: %s", drug_identifier)
     
-    loop = asyncio.get_event_loop()
-    label_info = await loop.run_in_executor(None, openfda_client.fetch_drug_label_info, drug_identifier, identifier_type)
+    label_info = await openfda_client.fetch_drug_label_info_async(drug_identifier, identifier_type)
     
     return {
         "drug_identifier": drug_identifier,
@@ -1,313 +1,1082 @@
 # openfda_client.py
-import requests
+import httpx
+import asyncio
+import collections
+import atexit
+import contextlib
+import weakref
+import functools
+import inspect
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from dotenv import load_dotenv
 import os
+import re
+import sqlite3
 import json
-import sys
-from typing import Dict, Any, List
+import logging
+import orjson
+from typing import Callable, Dict, Any, Iterator, List, Optional
 
 OPENFDA_API_KEY = os.environ.get("OPENFDA_API_KEY")
 DRUG_LABEL_ENDPOINT = "https://api.fda.gov/drug/label.json"
 DRUG_SHORTAGES_ENDPOINT = "https://api.fda.gov/drug/shortages.json" #https://open.fda.gov/apis/drug/drugshortages/how-to-use-the-endpoint/ link
 
-def fetch_drug_label_info(drug_identifier: str, identifier_type: str = "openfda.generic_name") -> Dict[str, Any]:
-    """Retrieve drug label information from openFDA"""
-    params = {
-        'search': f'{identifier_type}:"{drug_identifier}"',
+logger = logging.getLogger(__name__)
+
+# Query parameters sent with every openFDA request; set once on the clients rather than
+# merged into each call's params. Resolved on first use rather than at import, so the API key
+# from .env is picked up even when a server imports this module before calling load_dotenv().
+_INIT_LOCK = threading.Lock()
+_BASE_PARAMS: Optional[Dict[str, str]] = None
+
+def _base_params() -> Dict[str, str]:
+    global OPENFDA_API_KEY, _BASE_PARAMS
+    with _INIT_LOCK:
+        if _BASE_PARAMS is None:
+            load_dotenv()
+            OPENFDA_API_KEY = os.environ.get("OPENFDA_API_KEY")
+            _BASE_PARAMS = {"api_key": OPENFDA_API_KEY} if OPENFDA_API_KEY else {}
+        return _BASE_PARAMS
+
+_HEADERS = {"User-Agent": "MedicationInformationService/0.1", "Accept": "application/json"}
+
+# Transient failures are retried with exponential backoff (0.3s, 0.6s, 1.2s); the transports
+# also retry failed connection attempts
+_MAX_RETRIES = 3
+_BACKOFF_FACTOR = 0.3
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Connection setup gets its own short limit so an unreachable host fails fast; the per-call
+# timeout still covers reading the (up to limit=100) response body
+_CONNECT_TIMEOUT = 5.0
+
+# Longest Retry-After wait honored before giving up on the backoff schedule
+_MAX_RETRY_AFTER = 10.0
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's Retry-After (in seconds) when given, else backoff"""
+    retry_after = response.headers.get("Retry-After", "")
+    try:
+        return min(max(float(retry_after), 0.0), _MAX_RETRY_AFTER)
+    except ValueError:
+        return _BACKOFF_FACTOR * 2 ** attempt
+
+# Shared HTTP/2 client for the sync fetchers: api.fda.gov speaks HTTP/2, so concurrent
+# requests (e.g. batch worker threads) multiplex over one keep-alive TLS connection.
+# Created on first use so that importing this module opens no connections.
+_CLIENT: Optional[httpx.Client] = None
+
+def _get_client() -> httpx.Client:
+    global _CLIENT
+    if _CLIENT is None:
+        params = _base_params()
+        with _INIT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+                    timeout=httpx.Timeout(15, connect=_CONNECT_TIMEOUT),
+                    headers=_HEADERS,
+                    params=params,
+                    transport=httpx.HTTPTransport(http2=True, retries=_MAX_RETRIES)
+                )
+                atexit.register(_CLIENT.close)
+    return _CLIENT
+
+# Shared async clients for the *_async fetchers, one per event loop: a caller running its own
+# loop (asyncio.run from a worker thread) gets its own pool instead of another loop's sockets.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Return the keep-alive client for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=httpx.Timeout(15, connect=_CONNECT_TIMEOUT),
+            headers=_HEADERS,
+            params=_base_params(),
+            transport=httpx.AsyncHTTPTransport(http2=True, retries=_MAX_RETRIES)
+        )
+        _async_clients[loop] = client
+    return client
+
+# openFDA requests in flight per event loop, shared by every async fetcher (shortage strategies,
+# trends, recalls, bulk prefetch) so a batch fanning out across drugs stays inside the rate limit
+_ASYNC_REQUEST_CONCURRENCY = 5
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    """Return the request semaphore for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _async_semaphores[loop] = asyncio.Semaphore(_ASYNC_REQUEST_CONCURRENCY)
+    return semaphore
+
+async def aclose_async_client() -> None:
+    """Close the running loop's async client (call from the server's shutdown hook)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+_WARMUP_URL = "https://api.fda.gov/"
+
+def warm_up() -> threading.Thread:
+    """Open the sync client's TLS connection in a background thread so the first lookup skips the handshake; returns the thread"""
+    def run():
+        try:
+            _get_client().head(_WARMUP_URL, timeout=5)
+        except httpx.HTTPError:
+            pass
+    thread = threading.Thread(target=run, name="openfda-warmup", daemon=True)
+    thread.start()
+    return thread
+
+async def warm_up_async() -> None:
+    """Open the running loop's async client connection ahead of the first lookup (e.g. from a server lifespan)"""
+    try:
+        await _get_async_client().head(_WARMUP_URL, timeout=5)
+    except httpx.HTTPError:
+        pass
+
+@contextlib.asynccontextmanager
+async def client_lifespan(server: Any = None):
+    """Server lifespan hook: warm the pooled openFDA connections at startup and close them at shutdown"""
+    warmup = asyncio.create_task(warm_up_async())
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await aclose_async_client()
+
+def _run_async(coro) -> Any:
+    """Run an async fetcher to completion from sync code, closing its client afterwards"""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await aclose_async_client()
+    return asyncio.run(runner())
+
+# openFDA data changes over hours/days, so successful lookups are memoized for a few minutes.
+# The caches are shared by the sync and async fetchers and guarded by one lock.
+_CACHE_LOCK = threading.RLock()
+_LABEL_CACHE = TTLCache(maxsize=2048, ttl=600)
+_SHORTAGE_CACHE = TTLCache(maxsize=2048, ttl=600)
+_RECALL_CACHE = TTLCache(maxsize=2048, ttl=600)
+# Raw limit=100 trend payloads are larger, so fewer are kept
+_TREND_CACHE = TTLCache(maxsize=512, ttl=600)
+# Error results are remembered briefly so a failing lookup is not retried on every call,
+# without letting a transient failure stick for the full TTL
+_ERROR_CACHE = TTLCache(maxsize=512, ttl=60)
+
+def _ttl_cached(cache: TTLCache):
+    """Memoize a fetcher on its normalized arguments; results with an "error" key go to the short-lived _ERROR_CACHE"""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs) -> tuple:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            # "generic_name" and "openfda.generic_name" run the same search, so they share an entry
+            if "identifier_type" in arguments:
+                arguments["identifier_type"] = _IDTYPE_MAP.get(arguments["identifier_type"], arguments["identifier_type"])
+            drug_identifier, *rest = arguments.values()
+            return (drug_identifier.lower().strip(), *rest)
+
+        def lookup(key):
+            with _CACHE_LOCK:
+                cached = cache.get(key)
+                if cached is None:
+                    cached = _ERROR_CACHE.get((func.__qualname__, key))
+            if cached is not None:
+                logger.debug("cache hit for %s%r", func.__name__, key)
+            return cached
+
+        def store(key, result):
+            with _CACHE_LOCK:
+                if "error" in result:
+                    _ERROR_CACHE[(func.__qualname__, key)] = result
+                else:
+                    cache[key] = result
+
+        if inspect.iscoroutinefunction(func):
+            # Single-flight: concurrent misses for the same key on the same loop share one fetch.
+            # Each entry is [task, waiters]; the fetch is cancelled only once every waiter is gone.
+            inflight: Dict[tuple, list] = {}
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                cached = lookup(key)
+                if cached is not None:
+                    return cached
+                flight_key = (asyncio.get_running_loop(), key)
+                entry = inflight.get(flight_key)
+                if entry is None:
+                    entry = inflight[flight_key] = [asyncio.ensure_future(func(*args, **kwargs)), 0]
+                task = entry[0]
+                entry[1] += 1
+                try:
+                    result = await asyncio.shield(task)
+                finally:
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        task.cancel()
+                        if inflight.get(flight_key) is entry:
+                            del inflight[flight_key]
+                store(key, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            cached = lookup(key)
+            if cached is not None:
+                return cached
+            result = func(*args, **kwargs)
+            store(key, result)
+            return result
+        return wrapper
+    return decorator
+
+# Payloads of earlier responses and their validators (ETag / Last-Modified, when sent), keyed by
+# request, so a repeated query can be sent as a conditional GET and answered from a 304 without a body
+_CONDITIONAL_CACHE = TTLCache(maxsize=256, ttl=86400)
+_REQUEST_CACHE_CONTROL = "max-age=3600, stale-if-error=86400"
+
+# Setting OPENFDA_CACHE_DIR also keeps these entries in a SQLite file there, so they survive
+# restarts and the first query after a restart can still be answered by a 304
+_DISK_CACHE_TTL = 86400
+_disk_cache_conn: Optional[sqlite3.Connection] = None
+_disk_cache_checked = False
+# Serializes use of the shared SQLite connection. Separate from _CACHE_LOCK, which the event loop
+# takes directly, so a slow disk read or commit never holds up in-memory cache access.
+_DISK_LOCK = threading.Lock()
+
+def _disk_cache() -> Optional[sqlite3.Connection]:
+    """Open the persistent validator cache on first use; None when it is disabled or unusable"""
+    global _disk_cache_conn, _disk_cache_checked
+    if not _disk_cache_checked:
+        _base_params()  # make sure .env has been loaded
+        with _INIT_LOCK:
+            if not _disk_cache_checked:
+                cache_dir = os.environ.get("OPENFDA_CACHE_DIR")
+                if cache_dir:
+                    cache_dir = os.path.expanduser(cache_dir)
+                    try:
+                        os.makedirs(cache_dir, exist_ok=True)
+                        conn = sqlite3.connect(os.path.join(cache_dir, "openfda_cache.sqlite"), check_same_thread=False)
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS responses "
+                            "(key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB, stored_at REAL)"
+                        )
+                        conn.commit()
+                        _disk_cache_conn = conn
+                        atexit.register(conn.close)
+                    except (OSError, sqlite3.Error) as e:
+                        logger.warning("openFDA disk cache disabled: %s", e)
+                _disk_cache_checked = True
+    return _disk_cache_conn
+
+async def _off_loop(func, *args):
+    """Call a cache helper that may touch the SQLite disk cache from async code.
+
+    Disk reads and commits (and waits for _DISK_LOCK held by worker threads during theirs) run
+    in a thread so they never stall the event loop; with the disk cache off the helper only
+    touches memory and is called inline.
+    """
+    if _disk_cache_checked and _disk_cache_conn is None:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+def _load_validators(key: tuple) -> Optional[tuple]:
+    """(etag, last_modified, payload) stored for a request, from memory or the disk cache"""
+    with _CACHE_LOCK:
+        entry = _CONDITIONAL_CACHE.get(key)
+    if entry is not None:
+        return entry
+    conn = _disk_cache()
+    if conn is None:
+        return None
+    try:
+        with _DISK_LOCK:
+            row = conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ? AND stored_at > ?",
+                (repr(key), time.time() - _DISK_CACHE_TTL)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    entry = (row[0], row[1], orjson.loads(row[2]))
+    if row[0] or row[1]:
+        with _CACHE_LOCK:
+            _CONDITIONAL_CACHE[key] = entry
+    return entry
+
+def _save_validators(key: tuple, entry: tuple):
+    """Keep a response for conditional GETs (in memory, only when it has validators) and on disk"""
+    etag, last_modified, data = entry
+    if etag or last_modified:
+        with _CACHE_LOCK:
+            _CONDITIONAL_CACHE[key] = entry
+    conn = _disk_cache()
+    if conn is None:
+        return
+    try:
+        with _DISK_LOCK:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (repr(key), etag, last_modified, orjson.dumps(data), time.time())
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.debug("could not persist openFDA response: %s", e)
+
+# Disk entries younger than this are served without contacting openFDA, so a restarted process
+# (or another one sharing OPENFDA_CACHE_DIR) skips the network for recently fetched queries
+_DISK_FRESH_TTL = 3600
+
+def _fresh_disk_response(key: tuple) -> Optional[Dict[str, Any]]:
+    conn = _disk_cache()
+    if conn is None:
+        return None
+    try:
+        with _DISK_LOCK:
+            row = conn.execute(
+                "SELECT body FROM responses WHERE key = ? AND stored_at > ?",
+                (repr(key), time.time() - _DISK_FRESH_TTL)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    return orjson.loads(row[0]) if row else None
+
+def clear_disk_cache():
+    """Drop every response persisted under OPENFDA_CACHE_DIR (no-op when the disk cache is off)"""
+    conn = _disk_cache()
+    if conn is None:
+        return
+    with _DISK_LOCK:
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+    with _CACHE_LOCK:
+        _CONDITIONAL_CACHE.clear()
+
+def _conditional_headers(key: tuple) -> Dict[str, str]:
+    headers = {"Cache-Control": _REQUEST_CACHE_CONTROL}
+    entry = _load_validators(key)
+    if entry is not None:
+        etag, last_modified, _ = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+# A 200 body this short cannot hold a single openFDA record ({"meta": ..., "results": []} at most)
+_MIN_RESULT_BYTES = 60
+
+def _parse(response) -> Any:
+    """Decode a JSON body with orjson; its JSONDecodeError subclasses json.JSONDecodeError"""
+    return orjson.loads(response.content)
+
+def _conditional_result(key: tuple, response) -> Dict[str, Any]:
+    """Decode a response, or return the stored payload when the server answered 304 Not Modified"""
+    if response.status_code == 304:
+        entry = _load_validators(key)
+        if entry is not None:
+            return entry[2]
+    response.raise_for_status()
+    data = {"results": []} if len(response.content) < _MIN_RESULT_BYTES else _parse(response)
+    # Every successful body is kept, with or without validators, so the disk tier can serve it
+    # while fresh; the nullable etag/last_modified columns only matter for conditional GETs
+    _save_validators(key, (response.headers.get("ETag"), response.headers.get("Last-Modified"), data))
+    return data
+
+def _get_json(url: str, params: Dict[str, Any], timeout: float = 15) -> Dict[str, Any]:
+    """GET an openFDA endpoint through the shared client; raises on HTTP errors"""
+    key = (url, tuple(sorted(params.items())))
+    data = _fresh_disk_response(key)
+    if data is not None:
+        return data
+    for attempt in range(_MAX_RETRIES + 1):
+        response = _get_client().get(url, params=params, headers=_conditional_headers(key),
+                                     timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT))
+        if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+            break
+        time.sleep(_retry_delay(response, attempt))
+    return _conditional_result(key, response)
+
+async def _aget_json(client: httpx.AsyncClient, url: str, params: Dict[str, Any], timeout: float = 15) -> Dict[str, Any]:
+    """Async counterpart of _get_json"""
+    key = (url, tuple(sorted(params.items())))
+    data = await _off_loop(_fresh_disk_response, key)
+    if data is not None:
+        return data
+    headers = await _off_loop(_conditional_headers, key)
+    for attempt in range(_MAX_RETRIES + 1):
+        # Only the request itself holds a slot; backoff sleeps leave it to other requests
+        async with _get_async_semaphore():
+            response = await client.get(url, params=params, headers=headers,
+                                        timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT))
+        if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+            break
+        await asyncio.sleep(_retry_delay(response, attempt))
+    return await _off_loop(_conditional_result, key, response)
+
+# Shorthand identifier types accepted from MCP callers, mapped to openFDA label search fields.
+# Anything not listed is assumed to already be a field name and is passed through unchanged.
+_IDTYPE_MAP = {
+    "generic_name": "openfda.generic_name",
+    "brand_name": "openfda.brand_name",
+    "product_ndc": "openfda.product_ndc",
+}
+
+def _label_params(drug_identifier: str, identifier_type: str) -> Dict[str, Any]:
+    label_id_type = _IDTYPE_MAP.get(identifier_type, identifier_type)
+    return {
+        'search': f'{label_id_type}:"{drug_identifier}"',
         'limit': 1
     }
-    if OPENFDA_API_KEY:
-        params['api_key'] = OPENFDA_API_KEY
+
+def _label_result(data: Dict[str, Any], drug_identifier: str) -> Dict[str, Any]:
+    if data.get("results"):
+        return data["results"][0]
+    else:
+        return {"error": f"No label information found for '{drug_identifier}'"}
+
+# Fixed error results, shared rather than rebuilt per failure. Like every cached result they are
+# handed to all callers as-is, so they must not be mutated. Plain dicts (not MappingProxyType) so
+# the MCP layer can still serialize them.
+_TIMEOUT_ERROR = {"error": "Request timed out"}
+_INVALID_JSON_ERROR = {"error": "Invalid JSON response"}
+_BATCH_SIZE_ERROR = {
+    "error": "Batch size too large. Limit to 25 drugs per batch.",
+    "recommendation": "Split list into smaller batches"
+}
+
+@_ttl_cached(_LABEL_CACHE)
+def fetch_drug_label_info(drug_identifier: str, identifier_type: str = "openfda.generic_name") -> Dict[str, Any]:
+    """Retrieve drug label information from openFDA"""
+    params = _label_params(drug_identifier, identifier_type)
 
     try:
-        response = requests.get(DRUG_LABEL_ENDPOINT, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("results"):
-            return data["results"][0]
-        else:
-            return {"error": f"No label information found for '{drug_identifier}'"}
+        return _label_result(_get_json(DRUG_LABEL_ENDPOINT, params), drug_identifier)
             
-    except requests.exceptions.Timeout:
-        return {"error": "Request timed out"}
-    except requests.exceptions.HTTPError as e:
+    except httpx.TimeoutException:
+        return _TIMEOUT_ERROR
+    except httpx.HTTPStatusError as e:
         return {"error": f"HTTP error: {e.response.status_code}"}
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return {"error": f"Request failed: {str(e)}"}
     except json.JSONDecodeError:
-        return {"error": "Invalid JSON response"}
+        return _INVALID_JSON_ERROR
 
-def fetch_drug_shortage_info(drug_identifier: str) -> Dict[str, Any]:
-    """Search for drug shortage information"""
-    clean_name = drug_identifier.lower().strip()
-    if " and " in clean_name:
-        clean_name = clean_name.split(" and ")[0].strip()
+@_ttl_cached(_LABEL_CACHE)
+async def fetch_drug_label_info_async(drug_identifier: str, identifier_type: str = "openfda.generic_name") -> Dict[str, Any]:
+    """Async version of fetch_drug_label_info using the shared keep-alive client"""
+    params = _label_params(drug_identifier, identifier_type)
+
+    try:
+        return _label_result(await _aget_json(_get_async_client(), DRUG_LABEL_ENDPOINT, params), drug_identifier)
+
+    except httpx.TimeoutException:
+        return _TIMEOUT_ERROR
+    except httpx.HTTPStatusError as e:
+        return {"error": f"HTTP error: {e.response.status_code}"}
+    except httpx.HTTPError as e:
+        return {"error": f"Request failed: {str(e)}"}
+    except json.JSONDecodeError:
+        return _INVALID_JSON_ERROR
+
+# Dosage-form word stripped from the end of a name before searching shortages
+_SUFFIX_RE = re.compile(r"\s+(?:tablets|capsules|injection|oral|solution)\s*$", re.IGNORECASE)
+
+# Shortage search strategies as (query template, applies to the raw identifier). The raw-identifier
+# strategies only run when cleaning changed the name.
+_SHORTAGE_STRATEGIES = (
+    ('"{}"', False),
+    ('generic_name:"{}"', False),
+    ('proprietary_name:"{}"', False),
+    ('openfda.generic_name:"{}"', False),
+    ('openfda.brand_name:"{}"', False),
+    ('"{}"', True),
+    ('generic_name:"{}"', True),
+)
+
+@functools.lru_cache(maxsize=4096)
+def _clean_shortage_name(drug_identifier: str) -> str:
+    clean_name = drug_identifier.lower().strip().partition(" and ")[0].strip()
     
     # Remove common suffixes
-    suffixes = [" tablets", " capsules", " injection", " oral", " solution"]
-    for suffix in suffixes:
-        if clean_name.endswith(suffix):
-            clean_name = clean_name.replace(suffix, "").strip()
-    
-    # Try different search strategies
-    search_terms = [
-        f'"{clean_name}"',
-        f'generic_name:"{clean_name}"',
-        f'proprietary_name:"{clean_name}"',
-        f'openfda.generic_name:"{clean_name}"',
-        f'openfda.brand_name:"{clean_name}"'
-    ]
-    
+    return _SUFFIX_RE.sub("", clean_name).strip()
+
+def _strategy_slots(drug_identifier: str, clean_name: str) -> range:
     if clean_name != drug_identifier.lower():
-        search_terms.extend([
-            f'"{drug_identifier}"',
-            f'generic_name:"{drug_identifier}"'
-        ])
-    
-    for search_term in search_terms:
-        params = {
-            'search': search_term,
-            'limit': 20
-        }
-        if OPENFDA_API_KEY:
-            params['api_key'] = OPENFDA_API_KEY
+        return range(len(_SHORTAGE_STRATEGIES))
+    return range(sum(1 for _, raw in _SHORTAGE_STRATEGIES if not raw))
+
+def _search_strategy(slot: int, drug_identifier: str, clean_name: str) -> tuple:
+    """(search_term, search_clean): the openFDA query and the lower-cased name its results must match"""
+    template, raw = _SHORTAGE_STRATEGIES[slot]
+    name = drug_identifier if raw else clean_name
+    return template.format(name), name.lower()
+
+# Per-strategy (hits, attempts), keyed by the strategy's position in _SHORTAGE_STRATEGIES.
+# Strategies are tried in order of their Laplace-smoothed hit rate; ties keep the list order.
+_STRATEGY_STATS = collections.defaultdict(lambda: [0, 0])
+
+def _hit_rate(slot: int) -> float:
+    hits, attempts = _STRATEGY_STATS[slot]
+    return (hits + 1) / (attempts + 2)
+
+def _record_strategy(slot: int, hit: bool):
+    stats = _STRATEGY_STATS[slot]
+    stats[1] += 1
+    if hit:
+        stats[0] += 1
+
+def _ordered_search_terms(drug_identifier: str) -> Iterator[tuple]:
+    """Yield (slot, search_term, search_clean) triples, most productive strategy first.
+
+    Only the slot numbers are sorted; each query string is built when the caller reaches it, so
+    the sync path formats nothing past the strategy that finds matches.
+    """
+    clean_name = _clean_shortage_name(drug_identifier)
+    for slot in sorted(_strategy_slots(drug_identifier, clean_name), key=lambda s: -_hit_rate(s)):
+        yield (slot, *_search_strategy(slot, drug_identifier, clean_name))
+
+def _shortage_params(search_term: str) -> Dict[str, Any]:
+    return {
+        'search': search_term,
+        'limit': 20
+    }
+
+def _normalized_names(item: Dict[str, Any]):
+    """Lower-case the name fields of a shortage record once: (generic, proprietary, openfda generics, openfda brands)"""
+    openfda_data = item.get("openfda", {})
+    return (
+        item.get("generic_name", "").lower(),
+        item.get("proprietary_name", "").lower(),
+        tuple(name.lower() for name in openfda_data.get("generic_name", [])),
+        tuple(name.lower() for name in openfda_data.get("brand_name", []))
+    )
+
+# Fields copied from each matching shortage record, in output order; missing ones become "N/A"
+# except the list-valued fields in _SHORTAGE_DEFAULTS
+_SHORTAGE_FIELDS = ("generic_name", "proprietary_name", "status", "availability", "shortage_reason",
+                    "company_name", "dosage_form", "strength", "therapeutic_category", "initial_posting_date",
+                    "update_date", "update_type", "contact_info", "presentation")
+_SHORTAGE_DEFAULTS = {"strength": [], "therapeutic_category": []}
+_OPENFDA_INFO_FIELDS = ("generic_name", "brand_name", "manufacturer_name")
 
+def _names_match(names: tuple, search_clean: str) -> bool:
+    """Relevance rule: does a record's _normalized_names() match the cleaned search term"""
+    generic_name, proprietary_name, openfda_generic, openfda_brand = names
+    return (search_clean in generic_name or 
+            search_clean in proprietary_name or
+            any(search_clean in name for name in itertools.chain(openfda_generic, openfda_brand)) or
+            any(name in search_clean for name in openfda_generic if len(name) > 3))
+
+def _shortage_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    openfda_data = item.get("openfda", {})
+    shortage = {field: item.get(field, _SHORTAGE_DEFAULTS.get(field, "N/A")) for field in _SHORTAGE_FIELDS}
+    shortage["openfda_info"] = {field: openfda_data.get(field, []) for field in _OPENFDA_INFO_FIELDS}
+    return shortage
+
+def _match_shortages(data: Dict[str, Any], search_clean: str) -> List[Dict[str, Any]]:
+    """Keep the records of a shortage response that actually match the lower-cased search name"""
+    return [
+        _shortage_record(item) for item in data.get("results") or []
+        if _names_match(_normalized_names(item), search_clean)
+    ]
+
+def _no_shortage_result(drug_identifier: str, answered: bool) -> Dict[str, Any]:
+    """Result when no strategy found matches. "No shortages" is only claimed when at least one search
+    got a real answer (200 or 404); otherwise it is an error, so the short-lived error cache holds it."""
+    if answered:
+        return {"status": f"No current shortages found for '{drug_identifier}'"}
+    return {"error": f"Shortage lookup failed for '{drug_identifier}': no search strategy got an answer from openFDA"}
+
+@_ttl_cached(_SHORTAGE_CACHE)
+def fetch_drug_shortage_info(drug_identifier: str) -> Dict[str, Any]:
+    """Search for drug shortage information"""
+    answered = False
+    for slot, search_term, search_clean in _ordered_search_terms(drug_identifier):
         try:
-            response = requests.get(DRUG_SHORTAGES_ENDPOINT, params=params, timeout=15)
-            
-            if response.status_code == 404:
-                continue
-            elif response.status_code != 200:
-                continue
-                
-            data = response.json()
-            
-            if data.get("results"):
-                shortages = []
-                for item in data["results"]:
-                    generic_name = item.get("generic_name", "").lower()
-                    proprietary_name = item.get("proprietary_name", "").lower()
-                    
-                    openfda_data = item.get("openfda", {})
-                    openfda_generic = [name.lower() for name in openfda_data.get("generic_name", [])]
-                    openfda_brand = [name.lower() for name in openfda_data.get("brand_name", [])]
-                    
-                    search_clean = search_term.replace('generic_name:"', '').replace('proprietary_name:"', '').replace('"', '').lower()
-                    
-                    # Check if this record matches our search
-                    if (search_clean in generic_name or 
-                        search_clean in proprietary_name or
-                        any(search_clean in name for name in openfda_generic) or
-                        any(search_clean in name for name in openfda_brand) or
-                        any(name in search_clean for name in openfda_generic if len(name) > 3)):
-                        
-                        shortages.append({
-                            "generic_name": item.get("generic_name", "N/A"),
-                            "proprietary_name": item.get("proprietary_name", "N/A"),
-                            "status": item.get("status", "N/A"),
-                            "availability": item.get("availability", "N/A"),
-                            "shortage_reason": item.get("shortage_reason", "N/A"),
-                            "company_name": item.get("company_name", "N/A"),
-                            "dosage_form": item.get("dosage_form", "N/A"),
-                            "strength": item.get("strength", []),
-                            "therapeutic_category": item.get("therapeutic_category", []),
-                            "initial_posting_date": item.get("initial_posting_date", "N/A"),
-                            "update_date": item.get("update_date", "N/A"),
-                            "update_type": item.get("update_type", "N/A"),
-                            "contact_info": item.get("contact_info", "N/A"),
-                            "presentation": item.get("presentation", "N/A"),
-                            "openfda_info": {
-                                "generic_name": openfda_data.get("generic_name", []),
-                                "brand_name": openfda_data.get("brand_name", []),
-                                "manufacturer_name": openfda_data.get("manufacturer_name", [])
-                            }
-                        })
-                
-                if shortages:
-                    return {"shortages": shortages}
-                    
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
+            data = _get_json(DRUG_SHORTAGES_ENDPOINT, _shortage_params(search_term))
+        except httpx.HTTPStatusError as e:
+            # openFDA answers a search without matches with 404
+            if e.response.status_code == 404:
+                answered = True
+                _record_strategy(slot, False)
+            continue
+        except (httpx.HTTPError, json.JSONDecodeError):
             continue
+        answered = True
+        shortages = _match_shortages(data, search_clean)
+        _record_strategy(slot, bool(shortages))
+        if shortages:
+            return {"shortages": shortages}
     
-    return {"status": f"No current shortages found for '{drug_identifier}'"}
+    return _no_shortage_result(drug_identifier, answered)
 
-def search_drug_recalls(drug_identifier: str) -> Dict[str, Any]:
-    """Search for drug recalls"""
-    endpoint = "https://api.fda.gov/drug/enforcement.json"
-    params = {
+async def _fetch_shortage_matches_async(client: httpx.AsyncClient, search_term: str,
+                                        search_clean: str) -> Optional[List[Dict[str, Any]]]:
+    """Run one shortage search strategy: its matches, or None when openFDA gave no answer"""
+    try:
+        data = await _aget_json(client, DRUG_SHORTAGES_ENDPOINT, _shortage_params(search_term))
+        return _match_shortages(data, search_clean)
+    except httpx.HTTPStatusError as e:
+        return [] if e.response.status_code == 404 else None
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return None
+
+@_ttl_cached(_SHORTAGE_CACHE)
+async def fetch_drug_shortage_info_async(drug_identifier: str) -> Dict[str, Any]:
+    """Async version of fetch_drug_shortage_info using the shared keep-alive client"""
+    client = _get_async_client()
+    # Fire the strategies concurrently (the loop's request semaphore admits them in priority order),
+    # but still prefer them in order: the first strategy with matches wins and the rest are
+    # cancelled, including any still waiting for a slot
+    ordered = list(_ordered_search_terms(drug_identifier))
+    tasks = [
+        asyncio.create_task(_fetch_shortage_matches_async(client, search_term, search_clean))
+        for _, search_term, search_clean in ordered
+    ]
+    answered = False
+    try:
+        for (slot, _, _), task in zip(ordered, tasks):
+            shortages = await task
+            if shortages is None:
+                continue
+            answered = True
+            _record_strategy(slot, bool(shortages))
+            if shortages:
+                return {"shortages": shortages}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return _no_shortage_result(drug_identifier, answered)
+
+DRUG_ENFORCEMENT_ENDPOINT = "https://api.fda.gov/drug/enforcement.json"
+
+def _recall_params(drug_identifier: str) -> Dict[str, Any]:
+    return {
         'search': f'product_description:"{drug_identifier}"',
         'limit': 10
     }
-    if OPENFDA_API_KEY:
-        params['api_key'] = OPENFDA_API_KEY
 
+def _recall_result(data: Dict[str, Any], drug_identifier: str) -> Dict[str, Any]:
+    if data.get("results"):
+        recalls = []
+        for item in data["results"]:
+            recalls.append({
+                "product_description": item.get("product_description", "N/A"),
+                "reason_for_recall": item.get("reason_for_recall", "N/A"),
+                "classification": item.get("classification", "N/A"),
+                "status": item.get("status", "N/A"),
+                "recall_initiation_date": item.get("recall_initiation_date", "N/A"),
+                "recalling_firm": item.get("recalling_firm", "N/A")
+            })
+        return {"recalls": recalls}
+    else:
+        return {"status": f"No recalls found for '{drug_identifier}'"}
+
+@_ttl_cached(_RECALL_CACHE)
+def search_drug_recalls(drug_identifier: str) -> Dict[str, Any]:
+    """Search for drug recalls"""
     try:
-        response = requests.get(endpoint, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("results"):
-            recalls = []
-            for item in data["results"]:
-                recalls.append({
-                    "product_description": item.get("product_description", "N/A"),
-                    "reason_for_recall": item.get("reason_for_recall", "N/A"),
-                    "classification": item.get("classification", "N/A"),
-                    "status": item.get("status", "N/A"),
-                    "recall_initiation_date": item.get("recall_initiation_date", "N/A"),
-                    "recalling_firm": item.get("recalling_firm", "N/A")
-                })
-            return {"recalls": recalls}
-        else:
-            return {"status": f"No recalls found for '{drug_identifier}'"}
+        return _recall_result(_get_json(DRUG_ENFORCEMENT_ENDPOINT, _recall_params(drug_identifier)), drug_identifier)
             
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             return {"status": f"No recalls found for '{drug_identifier}'"}
         return {"error": f"HTTP error: {e.response.status_code}"}
     except Exception as e:
         return {"error": f"Error searching recalls: {str(e)}"}
 
-def analyze_drug_market_trends(drug_identifier: str, months_back: int = 12) -> Dict[str, Any]:
-    """Analyze shortage patterns and market trends for a drug"""
-    clean_name = drug_identifier.lower().strip()
-    
-    params = {
-        'search': f'"{clean_name}"',
+@_ttl_cached(_RECALL_CACHE)
+async def search_drug_recalls_async(drug_identifier: str) -> Dict[str, Any]:
+    """Async version of search_drug_recalls using the shared keep-alive client"""
+    try:
+        data = await _aget_json(_get_async_client(), DRUG_ENFORCEMENT_ENDPOINT, _recall_params(drug_identifier))
+        return _recall_result(data, drug_identifier)
+
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {"status": f"No recalls found for '{drug_identifier}'"}
+        return {"error": f"HTTP error: {e.response.status_code}"}
+    except Exception as e:
+        return {"error": f"Error searching recalls: {str(e)}"}
+
+def _trend_params(drug_identifier: str) -> Dict[str, Any]:
+    return {
+        'search': f'"{drug_identifier.lower().strip()}"',
         'limit': 100
     }
-    if OPENFDA_API_KEY:
-        params['api_key'] = OPENFDA_API_KEY
 
-    try:
-        response = requests.get(DRUG_SHORTAGES_ENDPOINT, params=params, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("results"):
-            return {
-                "drug_analyzed": drug_identifier,
-                "analysis_period_months": months_back,
-                "trend_summary": "No shortage data found",
-                "market_insights": {
-                    "shortage_frequency": "None",
-                    "risk_level": "Low",
-                    "recommendation": "No historical shortage patterns detected"
-                }
-            }
-        
-        # Filter relevant records
-        relevant_records = []
-        for item in data["results"]:
-            drug_name = item.get("generic_name", "").lower()
-            proprietary_name = item.get("proprietary_name", "").lower()
-            
-            if (clean_name in drug_name or 
-                clean_name in proprietary_name or
-                any(clean_name in name.lower() for name in item.get("openfda", {}).get("generic_name", []))):
-                relevant_records.append(item)
-        
-        if not relevant_records:
-            return {
-                "drug_analyzed": drug_identifier,
-                "analysis_period_months": months_back,
-                "trend_summary": "No relevant shortage records found",
-                "market_insights": {
-                    "shortage_frequency": "None",
-                    "risk_level": "Low",
-                    "recommendation": "No shortage history for this drug"
-                }
+def _analyze_trend_data(data: Dict[str, Any], drug_identifier: str, months_back: int) -> Dict[str, Any]:
+    """Summarize shortage history for a drug from a trend query response"""
+    clean_name = drug_identifier.lower().strip()
+
+    if not data.get("results"):
+        return {
+            "drug_analyzed": drug_identifier,
+            "analysis_period_months": months_back,
+            "trend_summary": "No shortage data found",
+            "market_insights": {
+                "shortage_frequency": "None",
+                "risk_level": "Low",
+                "recommendation": "No historical shortage patterns detected"
             }
+        }
+    
+    # Filter relevant records: one substring search per record over its joined name fields. The
+    # NUL separator never occurs in a drug name, so a match cannot straddle two fields.
+    relevant_records = []
+    for item in data["results"]:
+        drug_name, proprietary_name, openfda_generic, _ = _normalized_names(item)
         
-        # Analyze patterns
-        status_counts = {}
-        companies_affected = set()
-        reasons = []
-        recent_activity = 0
-        
-        for record in relevant_records:
-            status = record.get("status", "Unknown")
-            status_counts[status] = status_counts.get(status, 0) + 1
-            
-            company = record.get("company_name", "Unknown")
-            if company != "Unknown":
-                companies_affected.add(company)
-            
-            reason = record.get("shortage_reason", "")
-            if reason and reason != "N/A":
-                reasons.append(reason)
-            
-            if status in ["Current", "To Be Discontinued"]:
-                recent_activity += 1
-        
-        # Calculate risk
-        total_records = len(relevant_records)
-        current_shortages = status_counts.get("Current", 0)
-        resolved_shortages = status_counts.get("Resolved", 0)
-        
-        if current_shortages > 0:
-            risk_level = "High"
-        elif total_records > 5:
-            risk_level = "Medium"
-        else:
-            risk_level = "Low"
-        
-        # Build frequency description
-        frequency_desc = f"{total_records} shortage events found"
-        if total_records > 10:
-            frequency_desc += " (high frequency)"
-        elif total_records > 3:
-            frequency_desc += " (moderate frequency)"
-        else:
-            frequency_desc += " (low frequency)"
-        
-        # Top reasons
-        reason_summary = "Not specified"
-        if reasons:
-            from collections import Counter
-            top_reasons = Counter(reasons).most_common(3)
-            reason_summary = "; ".join([reason for reason, count in top_reasons])
-        
-        recommendation = f"Risk level: {risk_level}."
-        if current_shortages > 0:
-            recommendation += f" Monitor {current_shortages} current shortage(s)."
-        else:
-            recommendation += f" {resolved_shortages} resolved shortage(s) in history."
-        
+        if clean_name in "\0".join((drug_name, proprietary_name, *openfda_generic)):
+            relevant_records.append(item)
+    
+    if not relevant_records:
         return {
             "drug_analyzed": drug_identifier,
             "analysis_period_months": months_back,
-            "total_shortage_events": total_records,
-            "trend_summary": f"Found {total_records} shortage records affecting {len(companies_affected)} companies",
-            "status_breakdown": status_counts,
+            "trend_summary": "No relevant shortage records found",
             "market_insights": {
-                "shortage_frequency": frequency_desc,
-                "risk_level": risk_level,
-                "companies_affected": len(companies_affected),
-                "recent_activity": recent_activity,
-                "common_reasons": reason_summary,
-                "recommendation": recommendation
-            },
-            "detailed_records": relevant_records[:5]
+                "shortage_frequency": "None",
+                "risk_level": "Low",
+                "recommendation": "No shortage history for this drug"
+            }
         }
+    
+    # Analyze patterns
+    status_counts = dict(collections.Counter(record.get("status", "Unknown") for record in relevant_records))
+    companies_affected = {record.get("company_name", "Unknown") for record in relevant_records} - {"Unknown"}
+    reason_counts = collections.Counter(
+        reason for reason in (record.get("shortage_reason", "") for record in relevant_records)
+        if reason and reason != "N/A"
+    )
+    recent_activity = status_counts.get("Current", 0) + status_counts.get("To Be Discontinued", 0)
+    
+    # Calculate risk
+    total_records = len(relevant_records)
+    current_shortages = status_counts.get("Current", 0)
+    resolved_shortages = status_counts.get("Resolved", 0)
+    
+    if current_shortages > 0:
+        risk_level = "High"
+    elif total_records > 5:
+        risk_level = "Medium"
+    else:
+        risk_level = "Low"
+    
+    # Build frequency description
+    frequency_desc = f"{total_records} shortage events found"
+    if total_records > 10:
+        frequency_desc += " (high frequency)"
+    elif total_records > 3:
+        frequency_desc += " (moderate frequency)"
+    else:
+        frequency_desc += " (low frequency)"
+    
+    # Top reasons
+    reason_summary = "Not specified"
+    if reason_counts:
+        top_reasons = reason_counts.most_common(3)
+        reason_summary = "; ".join([reason for reason, count in top_reasons])
+    
+    recommendation = f"Risk level: {risk_level}."
+    if current_shortages > 0:
+        recommendation += f" Monitor {current_shortages} current shortage(s)."
+    else:
+        recommendation += f" {resolved_shortages} resolved shortage(s) in history."
+    
+    return {
+        "drug_analyzed": drug_identifier,
+        "analysis_period_months": months_back,
+        "total_shortage_events": total_records,
+        "trend_summary": f"Found {total_records} shortage records affecting {len(companies_affected)} companies",
+        "status_breakdown": status_counts,
+        "market_insights": {
+            "shortage_frequency": frequency_desc,
+            "risk_level": risk_level,
+            "companies_affected": len(companies_affected),
+            "recent_activity": recent_activity,
+            "common_reasons": reason_summary,
+            "recommendation": recommendation
+        },
+        "detailed_records": relevant_records[:5]
+    }
+
+def _trend_error(drug_identifier: str, e: Exception) -> Dict[str, Any]:
+    return {
+        "drug_analyzed": drug_identifier,
+        "error": f"Failed to analyze trends: {str(e)}",
+        "recommendation": "Unable to perform trend analysis"
+    }
+
+@_ttl_cached(_TREND_CACHE)
+def _fetch_trend_data(drug_identifier: str) -> Dict[str, Any]:
+    """The limit=100 trend query's response; failures raise and are not cached"""
+    return _get_json(DRUG_SHORTAGES_ENDPOINT, _trend_params(drug_identifier), timeout=20)
+
+@_ttl_cached(_TREND_CACHE)
+async def _fetch_trend_data_async(drug_identifier: str) -> Dict[str, Any]:
+    """Async version of _fetch_trend_data; concurrent callers for the same drug share one request"""
+    return await _aget_json(_get_async_client(), DRUG_SHORTAGES_ENDPOINT, _trend_params(drug_identifier), timeout=20)
+
+def analyze_drug_market_trends(drug_identifier: str, months_back: int = 12,
+                               prefetched_results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Analyze shortage patterns and market trends for a drug"""
+    try:
+        if prefetched_results is None:
+            data = _fetch_trend_data(drug_identifier)
+        else:
+            data = {"results": prefetched_results}
+        return _analyze_trend_data(data, drug_identifier, months_back)
         
     except Exception as e:
-        return {
-            "drug_analyzed": drug_identifier,
-            "error": f"Failed to analyze trends: {str(e)}",
-            "recommendation": "Unable to perform trend analysis"
+        return _trend_error(drug_identifier, e)
+
+async def analyze_drug_market_trends_async(drug_identifier: str, months_back: int = 12,
+                                           prefetched_results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Async version of analyze_drug_market_trends using the shared keep-alive client"""
+    try:
+        if prefetched_results is None:
+            data = await _fetch_trend_data_async(drug_identifier)
+        else:
+            data = {"results": prefetched_results}
+        return _analyze_trend_data(data, drug_identifier, months_back)
+
+    except Exception as e:
+        return _trend_error(drug_identifier, e)
+
+def _shortages_from_trend_results(drug_identifier: str, results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Answer the shortage lookup from a trend payload when possible.
+
+    The trend query is the plain quoted-name strategy with limit=100, so its first 20 records are
+    what that strategy would have fetched. That only stands in for a regular lookup while the
+    quoted-name strategy is the one tried first (hit-rate ordering can move another ahead of it)
+    and the name needs no suffix cleanup; a match is stored in the shortage cache. An entry already
+    in that cache is returned as-is. Returns None when the strategies must run.
+    """
+    clean_name = drug_identifier.lower().strip()
+    with _CACHE_LOCK:
+        cached = _SHORTAGE_CACHE.get((clean_name,))
+    if cached is not None:
+        return cached
+    if _clean_shortage_name(drug_identifier) != clean_name:
+        return None
+    first_slot, first_term, _ = next(_ordered_search_terms(drug_identifier))
+    if first_slot != 0 or first_term != _trend_params(drug_identifier)['search']:
+        return None
+    shortages = _match_shortages({"results": results[:20]}, clean_name)
+    if not shortages:
+        return None
+    shortage_info = {"shortages": shortages}
+    with _CACHE_LOCK:
+        _SHORTAGE_CACHE[(clean_name,)] = shortage_info
+    return shortage_info
+
+async def fetch_label_and_shortage_async(drug_identifier: str, identifier_type: str,
+                                        choose_search_term: Callable[[str, Dict[str, Any]], str]) -> tuple:
+    """Fetch a drug's label and shortage info as (label_info, shortage_search_term, shortage_info).
+
+    choose_search_term picks the shortage search term from the label. For generic-name lookups a
+    shortage lookup on the requested name starts while the label is fetched and is reused whenever
+    the chosen term turns out to be the same name; otherwise (or if the label fetch fails) it is
+    cancelled. Brand names and NDCs almost never equal the label's generic name, so for those the
+    shortage lookup waits for the label instead of spending request slots on a throwaway search.
+    """
+    shortage_task = None
+    if _IDTYPE_MAP.get(identifier_type, identifier_type) == "openfda.generic_name":
+        shortage_task = asyncio.create_task(fetch_drug_shortage_info_async(drug_identifier))
+    try:
+        label_info = await fetch_drug_label_info_async(drug_identifier, identifier_type=identifier_type)
+        shortage_search_term = choose_search_term(drug_identifier, label_info)
+    except BaseException:
+        if shortage_task is not None:
+            shortage_task.cancel()
+        raise
+
+    if shortage_task is not None and shortage_search_term.lower().strip() == drug_identifier.lower().strip():
+        shortage_info = await shortage_task
+    else:
+        if shortage_task is not None:
+            shortage_task.cancel()
+        shortage_info = await fetch_drug_shortage_info_async(shortage_search_term)
+    return label_info, shortage_search_term, shortage_info
+
+async def get_drug_overview_async(drug_identifier: str, identifier_type: str = "openfda.generic_name") -> Dict[str, Any]:
+    """Fetch label, shortage and recall data for one drug concurrently"""
+    fetched = await asyncio.gather(
+        fetch_drug_label_info_async(drug_identifier, identifier_type),
+        fetch_drug_shortage_info_async(drug_identifier),
+        search_drug_recalls_async(drug_identifier),
+        return_exceptions=True
+    )
+    return {
+        section: {"error": f"Lookup failed: {str(result)}"} if isinstance(result, Exception) else result
+        for section, result in zip(("label", "shortages", "recalls"), fetched)
+    }
+
+def get_drug_overview(drug_identifier: str, identifier_type: str = "openfda.generic_name") -> Dict[str, Any]:
+    """Fetch label, shortage and recall data for one drug.
+    Safe to call from inside a running event loop: the lookups then run on worker threads."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _run_async(get_drug_overview_async(drug_identifier, identifier_type))
+    # asyncio.run() cannot nest inside a running loop, so fall back to the sync fetchers on threads
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {
+            "label": executor.submit(fetch_drug_label_info, drug_identifier, identifier_type),
+            "shortages": executor.submit(fetch_drug_shortage_info, drug_identifier),
+            "recalls": executor.submit(search_drug_recalls, drug_identifier),
         }
+        overview = {}
+        for section, future in futures.items():
+            try:
+                overview[section] = future.result()
+            except Exception as e:
+                overview[section] = {"error": f"Lookup failed: {str(e)}"}
+        return overview
 
-def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> Dict[str, Any]:
-    """Analyze multiple drugs for shortages and risk assessment"""
-    print(f"analyzing {len(drug_list)} drugs", file=sys.stderr)
+# Largest page openFDA serves; the bulk query asks for room for 20 records per drug
+_MAX_LIMIT = 1000
+
+def _bulk_shortage_params(drug_list: List[str]) -> Optional[tuple]:
+    """(names, params): one OR query covering every batch drug not already in the shortage cache,
+    with the normalized names it covers. None when fewer than two drugs need it."""
+    with _CACHE_LOCK:
+        names = list(dict.fromkeys(
+            name for name in (drug.lower().strip() for drug in drug_list)
+            if (name,) not in _SHORTAGE_CACHE
+        ))
+    if len(names) < 2:
+        return None
+    escaped = (name.replace("\\", "").replace('"', "") for name in names)
+    return names, {
+        'search': "(" + " OR ".join(f'generic_name:"{name}"' for name in escaped) + ")",
+        'limit': min(_MAX_LIMIT, 20 * len(names))
+    }
+
+def _store_bulk_shortages(names: List[str], data: Dict[str, Any]):
+    """Split a bulk shortage response per queried name and prime the shortage cache with each one's matches.
+
+    Only the names the OR query covered are bucketed: a drug left out because it was already cached
+    would otherwise pick up substring matches (e.g. "insulin" from "insulin glargine" records).
+    Existing cache entries are never replaced. Each drug keeps at most 20 records, as its own
+    generic_name search would; drugs without matches are left to the regular per-drug strategies.
+    Nothing is cached unless the response holds every matching record (meta.results.total), since
+    a truncated page would leave the drugs near its end with partial buckets.
+    """
+    results = data.get("results") or []
+    total = ((data.get("meta") or {}).get("results") or {}).get("total")
+    if total is None or total > len(results):
+        logger.debug("bulk shortage response incomplete (%s of %s records); not priming the cache", len(results), total)
+        return
+
+    # Single pass over the records: each is normalized and converted once, then bucketed under
+    # every batch drug it matches
+    buckets = {name: [] for name in names}
+    for item in results:
+        names = _normalized_names(item)
+        shortage = None
+        for clean_name, shortages in buckets.items():
+            if len(shortages) < 20 and _names_match(names, clean_name):
+                shortage = shortage or _shortage_record(item)
+                shortages.append(shortage)
     
-    if len(drug_list) > 25:
-        return {
-            "error": "Batch size too large. Limit to 25 drugs per batch.",
-            "recommendation": "Split list into smaller batches"
-        }
+    with _CACHE_LOCK:
+        for clean_name, shortages in buckets.items():
+            if shortages and (clean_name,) not in _SHORTAGE_CACHE:
+                _SHORTAGE_CACHE[(clean_name,)] = {"shortages": shortages}
+
+async def _prefetch_bulk_shortages_async(drug_list: List[str]):
+    bulk = _bulk_shortage_params(drug_list)
+    if bulk is None:
+        return
+    names, params = bulk
+    try:
+        data = await _aget_json(_get_async_client(), DRUG_SHORTAGES_ENDPOINT, params, timeout=20)
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return
+    _store_bulk_shortages(names, data)
+
+def _prefetch_bulk_shortages(drug_list: List[str]):
+    bulk = _bulk_shortage_params(drug_list)
+    if bulk is None:
+        return
+    names, params = bulk
+    try:
+        data = _get_json(DRUG_SHORTAGES_ENDPOINT, params, timeout=20)
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return
+    _store_bulk_shortages(names, data)
+
+async def _fetch_batch_drug_data(drug: str, include_trends: bool) -> tuple:
+    """Fetch shortage, recall and (optionally) trend data for one drug concurrently"""
+    if not include_trends:
+        shortage_info, recall_info = await asyncio.gather(fetch_drug_shortage_info_async(drug), search_drug_recalls_async(drug))
+        return shortage_info, recall_info, None
     
+    # With trends on, the limit=100 trend query usually answers the shortage lookup as well
+    recall_task = asyncio.create_task(search_drug_recalls_async(drug))
+    try:
+        data = await _fetch_trend_data_async(drug)
+    except Exception as e:
+        trend_info = _trend_error(drug, e)
+        shortage_info = None
+    else:
+        results = data.get("results") or []
+        trend_info = await analyze_drug_market_trends_async(drug, months_back=6, prefetched_results=results)
+        shortage_info = _shortages_from_trend_results(drug, results)
+    if shortage_info is None:
+        shortage_info = await fetch_drug_shortage_info_async(drug)
+    return shortage_info, await recall_task, trend_info
+
+def _fetch_batch_drug_data_sync(drug: str, include_trends: bool) -> tuple:
+    """Blocking counterpart of _fetch_batch_drug_data, run on a worker thread"""
+    if not include_trends:
+        return fetch_drug_shortage_info(drug), search_drug_recalls(drug), None
+    
+    try:
+        data = _fetch_trend_data(drug)
+    except Exception as e:
+        trend_info = _trend_error(drug, e)
+        shortage_info = None
+    else:
+        results = data.get("results") or []
+        trend_info = analyze_drug_market_trends(drug, months_back=6, prefetched_results=results)
+        shortage_info = _shortages_from_trend_results(drug, results)
+    if shortage_info is None:
+        shortage_info = fetch_drug_shortage_info(drug)
+    return shortage_info, search_drug_recalls(drug), trend_info
+
+def _batch_size_error(drug_list: List[str]) -> Optional[Dict[str, Any]]:
+    logger.debug("analyzing %d drugs", len(drug_list))
+    
+    if len(drug_list) > 25:
+        return _BATCH_SIZE_ERROR
+    return None
+
+def _summarize_batch(drug_list: List[str], include_trends: bool, batch_data: List[Any]) -> Dict[str, Any]:
+    """Aggregate per-drug (shortage, recall, trend) lookups, or the exceptions they raised, into a batch report"""
     results = {
         "batch_summary": {
             "total_drugs_analyzed": len(drug_list),
@@ -326,7 +1095,7 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
         "formulary_recommendations": []
     }
     
-    for drug in drug_list:
+    for drug, drug_data in zip(drug_list, batch_data):
         drug_analysis = {
             "drug_name": drug,
             "shortage_status": "Unknown",
@@ -336,14 +1105,26 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
         }
         
         try:
+            if isinstance(drug_data, Exception):
+                raise drug_data
+            shortage_info, recall_info, trend_info = drug_data
+            
             # Check shortages
-            shortage_info = fetch_drug_shortage_info(drug)
-            if shortage_info.get("shortages"):
+            if shortage_info.get("error"):
+                drug_analysis["shortage_status"] = f"Lookup failed: {shortage_info['error']}"
+            elif shortage_info.get("shortages"):
                 drug_analysis["shortage_status"] = f"Found {len(shortage_info['shortages'])} shortage(s)"
                 results["batch_summary"]["drugs_with_shortages"] += 1
                 results["batch_summary"]["total_shortage_events"] += len(shortage_info["shortages"])
                 
-                current_shortages = sum(1 for s in shortage_info["shortages"] if s.get("status") == "Current")
+                # One pass for both the current-shortage count and the first five records' companies
+                current_shortages = 0
+                companies_affected = {}
+                for i, s in enumerate(shortage_info["shortages"]):
+                    if s.get("status") == "Current":
+                        current_shortages += 1
+                    if i < 5:
+                        companies_affected.setdefault(s.get("company_name", "Unknown"))
                 if current_shortages > 0:
                     drug_analysis["risk_level"] = "High"
                     results["risk_assessment"]["high_risk"].append(drug)
@@ -355,7 +1136,7 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
                 drug_analysis["details"]["shortage_summary"] = {
                     "total_records": len(shortage_info["shortages"]),
                     "current_shortages": current_shortages,
-                    "companies_affected": list(set(s.get("company_name", "Unknown") for s in shortage_info["shortages"][:5]))
+                    "companies_affected": list(companies_affected)
                 }
             else:
                 drug_analysis["shortage_status"] = "No current shortages"
@@ -363,7 +1144,6 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
                 results["risk_assessment"]["low_risk"].append(drug)
             
             # Check recalls
-            recall_info = search_drug_recalls(drug)
             if recall_info.get("recalls"):
                 drug_analysis["recall_status"] = f"Found {len(recall_info['recalls'])} recall(s)"
                 results["batch_summary"]["drugs_with_recalls"] += 1
@@ -376,7 +1156,6 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
             
             # Add trend analysis if requested
             if include_trends:
-                trend_info = analyze_drug_market_trends(drug, months_back=6)
                 drug_analysis["details"]["trend_analysis"] = {
                     "total_shortage_events": trend_info.get("total_shortage_events", 0),
                     "risk_level": trend_info.get("market_insights", {}).get("risk_level", "Unknown"),
@@ -405,4 +1184,49 @@ def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> D
     
     results["formulary_recommendations"].append(f"Analyzed {total_drugs} drugs with {results['batch_summary']['total_shortage_events']} total shortage events")
     
-    return results
\ No newline at end of file
+    return results
+
+async def batch_drug_analysis_async(drug_list: List[str], include_trends: bool = False) -> Dict[str, Any]:
+    """Analyze multiple drugs for shortages and risk assessment"""
+    error = _batch_size_error(drug_list)
+    if error:
+        return error
+    
+    # One OR query answers most shortage lookups up front (via the cache); all drugs are then
+    # looked up at once and aggregated in the original order
+    await _prefetch_bulk_shortages_async(drug_list)
+    batch_data = await asyncio.gather(
+        *(_fetch_batch_drug_data(drug, include_trends) for drug in drug_list),
+        return_exceptions=True
+    )
+    return _summarize_batch(drug_list, include_trends, batch_data)
+
+def _batch_drug_analysis_threaded(drug_list: List[str], include_trends: bool) -> Dict[str, Any]:
+    """Thread-pool variant of the batch, for callers already inside a running event loop"""
+    error = _batch_size_error(drug_list)
+    if error:
+        return error
+    
+    def fetch(drug):
+        try:
+            return _fetch_batch_drug_data_sync(drug, include_trends)
+        except Exception as e:
+            return e
+    
+    # A drug listed twice is fetched once: the sync fetchers have no single-flight, so concurrent
+    # workers would otherwise both miss the cache
+    _prefetch_bulk_shortages(drug_list)
+    unique_drugs = list(dict.fromkeys(drug_list))
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        fetched = dict(zip(unique_drugs, executor.map(fetch, unique_drugs)))
+    batch_data = [fetched[drug] for drug in drug_list]
+    return _summarize_batch(drug_list, include_trends, batch_data)
+
+def batch_drug_analysis(drug_list: List[str], include_trends: bool = False) -> Dict[str, Any]:
+    """Analyze multiple drugs for shortages and risk assessment"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _run_async(batch_drug_analysis_async(drug_list, include_trends))
+    # asyncio.run() cannot nest inside a running loop, so fall back to worker threads
+    return _batch_drug_analysis_threaded(drug_list, include_trends)
\ No newline at end of file
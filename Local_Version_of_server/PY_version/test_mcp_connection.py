@@ -4,8 +4,79 @@ Test if MCP server can be reached by a client
 """
 
 import subprocess
+import functools
+import importlib.util
 import json
+import os
+import selectors
 import sys
+import time
+from pathlib import Path
+
+# The server under test lives next to this script
+SERVER_PATH = Path(__file__).resolve().parent / "enhanced_mcp_server.py"
+CLAUDE_CONFIG_PATH = Path("~/Library/Application Support/Claude/claude_desktop_config.json").expanduser()
+
+# Printed to stderr by enhanced_mcp_server.py right before it starts serving stdio
+SERVER_BANNER = b"mcp server starting"
+# Longest wait for the banner; a stdio server that is still running by then counts as started
+STARTUP_TIMEOUT = 5
+
+def module_available(name):
+    """Whether a module can be found, without executing it (parent packages do get imported)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+@functools.lru_cache(maxsize=16)
+def _parse_config(path, mtime_ns):
+    # One bulk read; json.loads decodes the UTF-8 bytes itself
+    return json.loads(Path(path).read_bytes())
+
+def load_config(path):
+    """Parsed config file, re-read only when its modification time changes (treat as read-only)"""
+    return _parse_config(path, os.stat(path).st_mtime_ns)
+
+def probe_server_startup(server_path):
+    """Start the server and stop it as soon as its banner appears.
+
+    Returns (status, detail): "banner" when the banner was seen, "running" when the server was
+    still up at the deadline without printing it, "exited" when it quit early (detail holds its
+    stderr), or "error" when it could not be launched.
+
+    stderr is read raw from the pipe and searched as bytes; it is decoded only for the report.
+    """
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, str(server_path)],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, bufsize=0
+        )
+    except Exception as e:
+        return "error", str(e)
+    
+    output = b""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stderr, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(timeout=remaining):
+                    status = "running" if proc.poll() is None else "exited"
+                    break
+                chunk = os.read(proc.stderr.fileno(), 4096)
+                if not chunk:
+                    status = "exited"
+                    break
+                output += chunk
+                if SERVER_BANNER in output:
+                    status = "banner"
+                    break
+        return status, output.decode(errors="replace")
+    finally:
+        proc.kill()
+        proc.wait()
 
 def test_mcp_server():
     """Test if the MCP server responds correctly"""
@@ -13,46 +84,35 @@ def test_mcp_server():
     print("Testing MCP Server Connection")
     print("=" * 40)
     
-    server_path = "/Users/adityadamerla/Documents/GitHub/med_info_mcp_project/enhanced_mcp_server.py"
+    # Test if server starts without errors
+    print("1. Testing server startup...")
+    status, stderr_output = probe_server_startup(SERVER_PATH)
     
-    try:
-        # Test if server starts without errors
-        print("1. Testing server startup...")
-        result = subprocess.run([
-            "python3", server_path
-        ], capture_output=True, text=True, timeout=5)
-        
-        if "Starting Enhanced MCP Medication Information Server" in result.stderr:
-            print("   Server starts successfully")
-        else:
-            print("   Server startup failed")
-            print(f"   Error: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
+    if status == "banner":
+        print("   Server starts successfully")
+    elif status == "running":
         print("    Server started (timeout expected for stdio server)")
-    except Exception as e:
-        print(f"   Server startup error: {e}")
+    elif status == "exited":
+        print("   Server startup failed")
+        print(f"   Error: {stderr_output}")
+        return False
+    else:
+        print(f"   Server startup error: {stderr_output}")
         return False
     
     print("\n2. Testing config file...")
-    config_path = "~/Library/Application Support/Claude/claude_desktop_config.json"
-    expanded_path = config_path.replace("~", "/Users/adityadamerla")
-    
     try:
-        with open(expanded_path, 'r') as f:
-            config = json.load(f)
+        config = load_config(CLAUDE_CONFIG_PATH)
             
         if "mcp_servers" in config:
             print("    Config file exists and has mcp_servers")
             
             # Check if our server is configured
-            servers = config["mcp_servers"]
-            our_server = None
-            for server in servers:
-                if server.get("name") == "EnhancedMedicationInformationService":
-                    our_server = server
-                    break
+            servers_by_name = {
+                server["name"]: server for server in config["mcp_servers"]
+                if isinstance(server, dict) and "name" in server
+            }
+            our_server = servers_by_name.get("EnhancedMedicationInformationService")
             
             if our_server:
                 print("    EnhancedMedicationInformationService found in config")
@@ -65,7 +125,7 @@ def test_mcp_server():
             return False
             
     except FileNotFoundError:
-        print(f"   Config file not found at {expanded_path}")
+        print(f"   Config file not found at {CLAUDE_CONFIG_PATH}")
         print("   Create the config file in the correct location")
         return False
     except json.JSONDecodeError:
@@ -76,17 +136,15 @@ def test_mcp_server():
         return False
     
     print("\n3. Testing dependencies...")
-    try:
-        import mcp.server.fastmcp
+    if module_available("mcp.server.fastmcp"):
         print("    MCP SDK installed")
-    except ImportError:
+    else:
         print("   MCP SDK not installed - run: pip install mcp")
         return False
     
-    try:
-        import openfda_client
+    if module_available("openfda_client"):
         print("    OpenFDA client available")
-    except ImportError:
+    else:
         print("   OpenFDA client not found - check file location")
         return False
     
@@ -6,12 +6,9 @@ Final test of the complete, working MCP Medication Information Server
 import asyncio
 import sys
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # Import the enhanced server
-from enhanced_mcp_server import get_medication_profile_logic
+from enhanced_mcp_server import get_medication_profile
 import openfda_client
 
 async def test_mcp_tools():
@@ -28,7 +25,13 @@ async def test_mcp_tools():
         {"drug": "acetaminophen", "expected": "No current shortages"}
     ]
     
-    for case in test_cases:
+    # Fetch every profile (main MCP tool) at once, then report them in order
+    profiles = await asyncio.gather(
+        *(get_medication_profile(case["drug"], "openfda.generic_name") for case in test_cases),
+        return_exceptions=True
+    )
+    
+    for case, profile in zip(test_cases, profiles):
         drug = case["drug"]
         expected = case["expected"]
         
@@ -37,8 +40,8 @@ async def test_mcp_tools():
         print("-" * 50)
         
         try:
-            # Test the complete medication profile (main MCP tool)
-            profile = get_medication_profile_logic(drug, "openfda.generic_name")
+            if isinstance(profile, Exception):
+                raise profile
             
             print(f"Overall Status: {profile['overall_status']}")
             
@@ -112,14 +115,16 @@ async def demonstrate_real_world_usage():
         }
     ]
     
-    for example in examples:
+    # This simulates what your MCP server would return to Claude
+    shortage_results = await asyncio.gather(
+        *(openfda_client.fetch_drug_shortage_info_async(example['drug']) for example in examples)
+    )
+    
+    for example, shortage_info in zip(examples, shortage_results):
         print(f"\nClaude Query: \"{example['query']}\"")
         print(f"Purpose: {example['explanation']}")
         print("MCP Server Response:")
         
-        # This simulates what your MCP server would return to Claude
-        shortage_info = openfda_client.fetch_drug_shortage_info(example['drug'])
-        
         if shortage_info.get('shortages'):
             shortages = shortage_info['shortages']
             print(f"   Found {len(shortages)} shortage records")
@@ -131,9 +136,15 @@ if __name__ == "__main__":
     print("Final MCP Medication Information Server Test")
     print("Testing the complete, working implementation")
     
+    async def run_all():
+        try:
+            await test_mcp_tools()
+            await demonstrate_real_world_usage()
+        finally:
+            await openfda_client.aclose_async_client()
+    
     # Run the tests
-    asyncio.run(test_mcp_tools())
-    asyncio.run(demonstrate_real_world_usage())
+    asyncio.run(run_all())
     
     print(f"\nCONGRATULATIONS!")
     print("Ready to integrate with Claude! ")
\ No newline at end of file
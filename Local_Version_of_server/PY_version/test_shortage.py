@@ -3,12 +3,11 @@
 test script to check drugs that are more likely to have shortages
 """
 
+import asyncio
 import os
-from dotenv import load_dotenv
-load_dotenv()
+import sys
 
 import openfda_client
-from mcp_med_info_server import get_medication_profile_logic
 
 # Drugs that commonly have shortages
 test_drugs = [
@@ -21,30 +20,60 @@ test_drugs = [
     "lisinopril"    # your original query
 ]
 
+# Per-drug deadline, so one stalled openFDA request can't hold up the whole run
+SHORTAGE_TIMEOUT = 10
+
+async def fetch_shortage_with_deadline(drug):
+    try:
+        return await asyncio.wait_for(openfda_client.fetch_drug_shortage_info_async(drug), SHORTAGE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"error": f"timed out after {SHORTAGE_TIMEOUT}s"}
+
+async def fetch_all_shortages():
+    """Look up every test drug at once; exceptions are returned in place of results"""
+    try:
+        return await asyncio.gather(
+            *(fetch_shortage_with_deadline(drug) for drug in test_drugs),
+            return_exceptions=True
+        )
+    finally:
+        await openfda_client.aclose_async_client()
+
 print("testing drugs that commonly have shortages...")
 print("=" * 60)
 
-for drug in test_drugs:
-    print(f"\ntesting: {drug.upper()}")
-    print("-" * 30)
+# One report row per shortage record, filled from the record's own keys
+SHORTAGE_ROW = (
+    "      {index}. {generic_name}\n"
+    "         status: {status}\n"
+    "         reason: {shortage_reason}"
+)
+
+# Collect the per-drug report and write it in one go rather than a print per line
+report = []
+for drug, shortage_result in zip(test_drugs, asyncio.run(fetch_all_shortages())):
+    report.append(f"\ntesting: {drug.upper()}")
+    report.append("-" * 30)
     
     try:
-        # Test shortage lookup directly
-        shortage_result = openfda_client.fetch_drug_shortage_info(drug)
+        if isinstance(shortage_result, Exception):
+            raise shortage_result
         
         if shortage_result.get("shortages"):
-            print(f"    shortage found! {len(shortage_result['shortages'])} records")
-            for i, shortage in enumerate(shortage_result["shortages"][:2]):  # Show first 2
-                print(f"      {i+1}. {shortage['drug_name_reported']}")
-                print(f"         status: {shortage['status']}")
-                print(f"         reason: {shortage['reason']}")
+            report.append(f"    shortage found! {len(shortage_result['shortages'])} records")
+            report.extend(  # Show first 2
+                SHORTAGE_ROW.format(index=i + 1, **shortage)
+                for i, shortage in enumerate(shortage_result["shortages"][:2])
+            )
         elif shortage_result.get("error"):
-            print(f"   error: {shortage_result['error']}")
+            report.append(f"   error: {shortage_result['error']}")
         else:
-            print(f"   no shortage: {shortage_result.get('status', 'unknown')}")
+            report.append(f"   no shortage: {shortage_result.get('status', 'unknown')}")
             
     except Exception as e:
-        print(f"   exception: {e}")
+        report.append(f"   exception: {e}")
+
+sys.stdout.write("\n".join(report) + "\n")
 
 print("\n" + "=" * 60)
 print("if you see 'shortage found!' above, your shortage detection is working!")
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the openFDA client's caching and request handling.
+
+openFDA is replaced by httpx.MockTransport handlers injected as the client's shared sync client
+(openfda_client._CLIENT) and the running loop's async client (openfda_client._async_clients),
+so these run without network access or an API key.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from cachetools import TTLCache
+
+# Add the parent directory to Python path (where the main modules are) unless pytest already did
+PARENT_DIR = Path(__file__).resolve().parent.parent
+if str(PARENT_DIR) not in sys.path:
+    sys.path.insert(0, str(PARENT_DIR))
+
+import openfda_client
+
+def shortage_response(*generic_names, total=None):
+    """200 response holding one shortage record per name; meta.results.total defaults to the record count"""
+    results = [{"generic_name": name, "status": "Current", "company_name": "Acme"} for name in generic_names]
+    meta = {"results": {"skip": 0, "limit": 100, "total": len(results) if total is None else total}}
+    return httpx.Response(200, json={"meta": meta, "results": results})
+
+def label_response(generic_name):
+    return httpx.Response(200, json={"results": [{"openfda": {"generic_name": [generic_name.upper()]},
+                                                  "indications_and_usage": ["test label"]}]})
+
+class Clock:
+    """Manually advanced timer for TTLCache"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(autouse=True)
+def offline_client(monkeypatch):
+    """Isolate each test: empty caches, no disk tier, no .env lookup and no backoff sleeps"""
+    caches = (openfda_client._LABEL_CACHE, openfda_client._SHORTAGE_CACHE, openfda_client._RECALL_CACHE,
+              openfda_client._TREND_CACHE, openfda_client._ERROR_CACHE, openfda_client._CONDITIONAL_CACHE)
+    for cache in caches:
+        cache.clear()
+    openfda_client._STRATEGY_STATS.clear()
+    monkeypatch.setattr(openfda_client, "_BASE_PARAMS", {})
+    monkeypatch.setattr(openfda_client, "_disk_cache_checked", True)
+    monkeypatch.setattr(openfda_client, "_disk_cache_conn", None)
+    monkeypatch.setattr(openfda_client, "_BACKOFF_FACTOR", 0)
+    yield
+    for cache in caches:
+        cache.clear()
+    openfda_client._STRATEGY_STATS.clear()
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    """Route the sync fetchers through a MockTransport handler"""
+    def install(handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(openfda_client, "_CLIENT", client)
+        return client
+    return install
+
+def run_async(handler, coro_factory):
+    """Run coro_factory() on a fresh loop whose openFDA async client uses a MockTransport handler"""
+    async def runner():
+        openfda_client._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        try:
+            return await coro_factory()
+        finally:
+            await openfda_client.aclose_async_client()
+    return asyncio.run(runner())
+
+def test_shortage_outage_is_not_cached_as_success(use_transport, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(openfda_client, "_ERROR_CACHE", TTLCache(maxsize=512, ttl=60, timer=clock))
+    api = {"up": False, "requests": 0}
+
+    def handler(request):
+        api["requests"] += 1
+        return shortage_response("heparin") if api["up"] else httpx.Response(503)
+
+    use_transport(handler)
+    result = openfda_client.fetch_drug_shortage_info("heparin")
+    assert "error" in result
+    assert ("heparin",) not in openfda_client._SHORTAGE_CACHE
+
+    # openFDA recovers; once the error entry expires the next call asks again
+    api["up"] = True
+    api["requests"] = 0
+    clock.now += 61
+    result = openfda_client.fetch_drug_shortage_info("heparin")
+    assert api["requests"] > 0
+    assert result["shortages"][0]["generic_name"] == "heparin"
+
+def test_async_shortage_outage_returns_error():
+    result = run_async(lambda request: httpx.Response(503),
+                       lambda: openfda_client.fetch_drug_shortage_info_async("heparin"))
+    assert "error" in result
+    assert ("heparin",) not in openfda_client._SHORTAGE_CACHE
+
+def test_shortage_not_found_is_a_real_answer(use_transport):
+    use_transport(lambda request: httpx.Response(404))
+    result = openfda_client.fetch_drug_shortage_info("heparin")
+    assert "error" not in result
+    assert result["status"].startswith("No current shortages found")
+
+def test_bulk_prefetch_skips_truncated_response(use_transport):
+    drugs = ["heparin", "insulin"]
+    use_transport(lambda request: shortage_response(*["heparin"] * 5, total=30))
+    openfda_client._prefetch_bulk_shortages(drugs)
+    assert ("heparin",) not in openfda_client._SHORTAGE_CACHE
+
+    use_transport(lambda request: shortage_response(*["heparin"] * 5))
+    openfda_client._prefetch_bulk_shortages(drugs)
+    assert len(openfda_client._SHORTAGE_CACHE[("heparin",)]["shortages"]) == 5
+    assert ("insulin",) not in openfda_client._SHORTAGE_CACHE
+
+def test_bulk_prefetch_leaves_cached_drugs_alone(use_transport):
+    cached = {"shortages": [{"generic_name": "insulin"}] * 7}
+    openfda_client._SHORTAGE_CACHE[("insulin",)] = cached
+    searches = []
+
+    def handler(request):
+        searches.append(request.url.params["search"])
+        return shortage_response("insulin glargine", "insulin glargine", "heparin")
+
+    use_transport(handler)
+    openfda_client._prefetch_bulk_shortages(["insulin", "insulin glargine", "heparin"])
+    assert searches == ['(generic_name:"insulin glargine" OR generic_name:"heparin")']
+    assert openfda_client._SHORTAGE_CACHE[("insulin",)] is cached
+    assert len(openfda_client._SHORTAGE_CACHE[("insulin glargine",)]["shortages"]) == 2
+    assert len(openfda_client._SHORTAGE_CACHE[("heparin",)]["shortages"]) == 1
+
+def test_concurrent_async_lookups_share_one_request():
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return label_response("lisinopril")
+
+    async def lookups():
+        return await asyncio.gather(*(
+            openfda_client.fetch_drug_label_info_async(name) for name in ("lisinopril", "Lisinopril", " LISINOPRIL ")
+        ))
+
+    results = run_async(handler, lookups)
+    assert len(requests) == 1
+    assert results[0] is results[1] is results[2]
+
+def test_short_and_full_identifier_types_share_a_cache_entry(use_transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return label_response("lisinopril")
+
+    use_transport(handler)
+    first = openfda_client.fetch_drug_label_info("lisinopril", identifier_type="generic_name")
+    second = openfda_client.fetch_drug_label_info("lisinopril", identifier_type="openfda.generic_name")
+    assert len(requests) == 1
+    assert second is first
+
+def test_async_requests_are_bounded_per_loop():
+    in_flight = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(404)
+
+    drugs = [f"drug{i}" for i in range(25)]
+    run_async(handler, lambda: openfda_client.batch_drug_analysis_async(drugs, include_trends=True))
+    assert 0 < in_flight["peak"] <= openfda_client._ASYNC_REQUEST_CONCURRENCY
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_repeated_trend_batch_is_served_from_cache(use_transport, threaded):
+    trend_requests = []
+    other_requests = []
+
+    def handler(request):
+        if request.url.params.get("limit") == "100":
+            trend_requests.append(request)
+            return shortage_response("heparin")
+        other_requests.append(request)
+        return httpx.Response(404)
+
+    drugs = ["heparin", "heparin"]
+    for _ in range(2):
+        if threaded:
+            use_transport(handler)
+            report = openfda_client._batch_drug_analysis_threaded(drugs, include_trends=True)
+        else:
+            report = run_async(handler, lambda: openfda_client.batch_drug_analysis_async(drugs, include_trends=True))
+        assert report["individual_analyses"]["heparin"]["shortage_status"] == "Found 1 shortage(s)"
+    assert len(trend_requests) == 1
+    assert len(other_requests) == 1  # the recall search; the shortage came from the trend payload
+
+def test_overview_works_inside_a_running_loop(use_transport):
+    def handler(request):
+        if "label" in request.url.path:
+            return label_response("lisinopril")
+        return httpx.Response(404)
+
+    use_transport(handler)
+
+    async def from_loop():
+        return openfda_client.get_drug_overview("lisinopril")
+
+    overview = asyncio.run(from_loop())
+    assert overview["label"]["openfda"]["generic_name"] == ["LISINOPRIL"]
+    assert "error" not in overview["shortages"]
+
+def test_brand_name_profile_skips_speculative_shortage_lookup():
+    shortage_searches = []
+
+    def handler(request):
+        if "label" in request.url.path:
+            return label_response("lisinopril")
+        shortage_searches.append(request.url.params["search"])
+        return httpx.Response(404)
+
+    def choose_search_term(drug_identifier, label_info):
+        return label_info["openfda"]["generic_name"][0]
+
+    label_info, search_term, shortage_info = run_async(handler, lambda: openfda_client.fetch_label_and_shortage_async(
+        "Zestril", "openfda.brand_name", choose_search_term
+    ))
+    assert search_term == "LISINOPRIL"
+    assert shortage_searches and all("zestril" not in search.lower() for search in shortage_searches)
+
+def test_retry_after_is_honored_then_capped():
+    assert openfda_client._retry_delay(httpx.Response(429, headers={"Retry-After": "2"}), 0) == 2.0
+    assert openfda_client._retry_delay(httpx.Response(429, headers={"Retry-After": "3600"}), 0) == openfda_client._MAX_RETRY_AFTER
+    assert openfda_client._retry_delay(httpx.Response(429), 1) == openfda_client._BACKOFF_FACTOR * 2
+
+def test_rate_limited_request_is_retried(use_transport):
+    statuses = iter([429, 200])
+
+    def handler(request):
+        if next(statuses) == 429:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return label_response("lisinopril")
+
+    use_transport(handler)
+    result = openfda_client.fetch_drug_label_info("lisinopril")
+    assert result["openfda"]["generic_name"] == ["LISINOPRIL"]
+
+def test_conditional_get_reuses_payload_on_304(use_transport):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        response = label_response("lisinopril")
+        response.headers["ETag"] = '"v1"'
+        return response
+
+    use_transport(handler)
+    first = openfda_client.fetch_drug_label_info("lisinopril")
+    openfda_client._LABEL_CACHE.clear()
+    second = openfda_client.fetch_drug_label_info("lisinopril")
+    assert seen == [None, '"v1"']
+    assert second == first
+
+def test_disk_tier_serves_responses_without_validators(use_transport, monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENFDA_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(openfda_client, "_disk_cache_checked", False)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return label_response("lisinopril")
+
+    use_transport(handler)
+    try:
+        first = openfda_client.fetch_drug_label_info("lisinopril")
+        openfda_client._LABEL_CACHE.clear()
+        second = openfda_client.fetch_drug_label_info("lisinopril")
+    finally:
+        openfda_client._disk_cache_conn.close()
+    assert len(requests) == 1
+    assert second == first
@@ -1,104 +1,159 @@
 #!/usr/bin/env python3
 """
 test script for the server, run it from the root of the project.
+
+Needs the test dependencies (pip install -r requirements-dev.txt). Each drug is its own pytest
+case, so the suite can be spread across workers with pytest-xdist: pytest tests/ -n auto --dist=loadfile
 """
 
 import os
 import sys
-import json
+import logging
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import Final, Optional
 from dotenv import load_dotenv
 
-# Add the parent directory to Python path (where the main modules are)
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_dir)
+# Add the parent directory to Python path (where the main modules are) unless pytest already did
+PARENT_DIR = Path(__file__).resolve().parent.parent
+if str(PARENT_DIR) not in sys.path:
+    sys.path.insert(0, str(PARENT_DIR))
 
-# Load environment variables from parent directory
-load_dotenv(os.path.join(parent_dir, '.env'))
+# Load environment variables from parent directory, if it has a .env file
+ENV_FILE = PARENT_DIR / '.env'
+if ENV_FILE.is_file():
+    load_dotenv(ENV_FILE, override=False)
 
 try:
     # Import your modules
     import openfda_client
-    from mcp_med_info_server import get_medication_profile_logic
-    print("✓ Successfully imported modules")
+    from mcp_med_info_server import get_medication_profiles_logic
 except ImportError as e:
     print(f"✗ Import error: {e}")
     print(f"Current working directory: {os.getcwd()}")
     print(f"Python path: {sys.path}")
-    print(f"Parent directory: {parent_dir}")
-    print(f"Files in parent directory: {os.listdir(parent_dir)}")
-    sys.exit(1)
-
-def test_openfda_client():
-    """Test the OpenFDA client functions directly"""
-    print("=" * 60)
-    print("TESTING OPENFDA CLIENT")
-    print("=" * 60)
-    
-    # Test drugs
-    test_drugs = ["lisinopril", "amoxicillin", "acetaminophen"]
-    
-    for drug in test_drugs:
-        print(f"\n--- Testing {drug.upper()} ---")
-        
-        # Test label info
-        print(f"1. Label Information:")
-        label_data = openfda_client.fetch_drug_label_info(drug)
-        if label_data.get("error"):
-            print(f"   Error: {label_data['error']}")
-        else:
-            openfda_data = label_data.get("openfda", {})
-            print(f"   Generic: {openfda_data.get('generic_name', ['N/A'])}")
-            print(f"   Brand: {openfda_data.get('brand_name', ['N/A'])}")
-            print(f"   Manufacturer: {openfda_data.get('manufacturer_name', ['N/A'])}")
-        
-        # Test shortage info
-        print(f"2. Shortage Information:")
-        shortage_data = openfda_client.fetch_drug_shortage_info(drug)
-        if shortage_data.get("error"):
-            print(f"   Error: {shortage_data['error']}")
-        elif shortage_data.get("shortages"):
-            print(f"   Found {len(shortage_data['shortages'])} shortage(s)")
-            for shortage in shortage_data["shortages"]:
-                print(f"   - {shortage['drug_name_reported']}: {shortage['status']}")
-        else:
-            print(f"   Status: {shortage_data.get('status', 'No shortage information')}")
-
-def test_mcp_server_logic():
+    print(f"Parent directory: {PARENT_DIR}")
+    print(f"Files in parent directory: {os.listdir(PARENT_DIR)}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+API_KEY: Final[Optional[str]] = os.environ.get('OPENFDA_API_KEY')
+
+# Every case hits the live API; without a key they would mostly run into the unauthenticated rate limit
+pytestmark = pytest.mark.skipif(not API_KEY, reason="OPENFDA_API_KEY not set; skipping live openFDA tests")
+
+TEST_DRUGS = ["lisinopril", "amoxicillin", "acetaminophen"]
+PROFILE_DRUGS = ["lisinopril", "acetaminophen"]
+PROFILE_FIELDS = itemgetter("overall_status", "label_information", "shortage_status")
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_fda():
+    """Open the connection to api.fda.gov once, before the concurrent lookups start"""
+    openfda_client.warm_up().join(timeout=5)
+
+def fetch_client_results(drugs):
+    """Run every label and shortage lookup at once, keyed by (function name, drug)"""
+    tasks = [(openfda_client.fetch_drug_label_info, drug) for drug in drugs]
+    tasks += [(openfda_client.fetch_drug_shortage_info, drug) for drug in drugs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = pool.map(lambda task: task[0](task[1]), tasks)
+        return {(fetch.__name__, drug): result for (fetch, drug), result in zip(tasks, results)}
+
+@pytest.fixture(scope="session")
+def client_results():
+    return fetch_client_results(TEST_DRUGS)
+
+@pytest.mark.parametrize("drug", TEST_DRUGS)
+def test_label_info(drug, client_results):
+    """Test the OpenFDA label lookup directly"""
+    logger.debug("\n--- Testing %s ---", drug.upper())
+    logger.debug("1. Label Information:")
+    label_data = client_results["fetch_drug_label_info", drug]
+    assert isinstance(label_data, dict) and label_data
+
+    if label_data.get("error"):
+        logger.debug("   Error: %s", label_data["error"])
+    else:
+        openfda_data = label_data.get("openfda", {})
+        logger.debug("   Generic: %s", openfda_data.get("generic_name", "N/A"))
+        logger.debug("   Brand: %s", openfda_data.get("brand_name", "N/A"))
+        logger.debug("   Manufacturer: %s", openfda_data.get("manufacturer_name", "N/A"))
+
+@pytest.mark.parametrize("drug", TEST_DRUGS)
+def test_shortage_info(drug, client_results):
+    """Test the OpenFDA shortage lookup directly"""
+    logger.debug("2. Shortage Information:")
+    shortage_data = client_results["fetch_drug_shortage_info", drug]
+    assert "error" in shortage_data or "shortages" in shortage_data or "status" in shortage_data
+
+    shortages = shortage_data.get("shortages") or ()
+    if shortage_data.get("error"):
+        logger.debug("   Error: %s", shortage_data["error"])
+    elif shortages:
+        logger.debug("   Found %d shortage(s)", len(shortages))
+        for shortage in shortages:
+            logger.debug("   - %s: %s", shortage.get("generic_name", drug), shortage.get("status"))
+    else:
+        logger.debug("   Status: %s", shortage_data.get("status", "No shortage information"))
+
+@pytest.mark.parametrize("fetch", [openfda_client.fetch_drug_label_info, openfda_client.fetch_drug_shortage_info])
+def test_repeat_lookup_is_cached(fetch, client_results):
+    """A repeat lookup, in any case or spacing, is answered from the client's TTL cache"""
+    drug = TEST_DRUGS[0]
+    assert fetch(f" {drug.upper()} ") is client_results[fetch.__name__, drug]
+
+@pytest.fixture(scope="session")
+def profiles():
+    return get_medication_profiles_logic(PROFILE_DRUGS, "openfda.generic_name")
+
+@pytest.mark.parametrize("drug", PROFILE_DRUGS)
+def test_profile_logic(drug, profiles):
     """Test the MCP server logic functions"""
-    print("\n" + "=" * 60)
-    print("TESTING MCP SERVER LOGIC")
-    print("=" * 60)
-    
-    test_drugs = ["lisinopril", "acetaminophen"]
-    
-    for drug in test_drugs:
-        print(f"\n--- Testing MCP Logic for {drug.upper()} ---")
-        
-        try:
-            profile = get_medication_profile_logic(drug, "openfda.generic_name")
-            print(f"Overall Status: {profile['overall_status']}")
-            print(f"Label Error: {'error' in profile['label_information']}")
-            print(f"Shortage Data: {'shortages' in profile['shortage_status']}")
-            
-            if 'shortages' in profile['shortage_status']:
-                print(f"Number of shortages: {len(profile['shortage_status']['shortages'])}")
-            
-        except Exception as e:
-            print(f"Error testing {drug}: {e}")
+    logger.debug("\n--- Testing MCP Logic for %s ---", drug.upper())
+    status, label_info, shortage_status = PROFILE_FIELDS(profiles[drug])
+    assert status
+
+    logger.debug("Overall Status: %s", status)
+    logger.debug("Label Error: %s", 'error' in label_info)
+    shortages = shortage_status.get('shortages')
+    logger.debug("Shortage Data: %s", shortages is not None)
+
+    if shortages is not None:
+        logger.debug("Number of shortages: %d", len(shortages))
 
 def main():
-    """Main test function"""
+    """Run the same cases without pytest"""
+    # The cases report through the module logger; show that output on stdout when run as a script
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    logger.propagate = False
     print("MCP Medication Information Server - Test Suite")
-    print(f"OpenFDA API Key: {'SET' if os.getenv('OPENFDA_API_KEY') else 'NOT SET'}")
+    print(f"OpenFDA API Key: {'SET' if API_KEY else 'NOT SET'}")
     
-    if not os.getenv('OPENFDA_API_KEY'):
+    if not API_KEY:
         print("\nWARNING: No OpenFDA API key found!")
         print("Set OPENFDA_API_KEY in your .env file or environment variables")
         print("You can still test without an API key, but you'll have rate limits")
     
     try:
-        test_openfda_client()
-        test_mcp_server_logic()
+        print("=" * 60)
+        print("TESTING OPENFDA CLIENT")
+        print("=" * 60)
+        openfda_client.warm_up().join(timeout=5)
+        results = fetch_client_results(TEST_DRUGS)
+        for drug in TEST_DRUGS:
+            test_label_info(drug, results)
+            test_shortage_info(drug, results)
+
+        print("\n" + "=" * 60)
+        print("TESTING MCP SERVER LOGIC")
+        print("=" * 60)
+        profiles = get_medication_profiles_logic(PROFILE_DRUGS, "openfda.generic_name")
+        for drug in PROFILE_DRUGS:
+            test_profile_logic(drug, profiles)
         
         print("\n" + "=" * 60)
         print("TEST COMPLETE")
@@ -107,8 +162,8 @@ def main():
         print("You can now test it with your MCP client.")
         
     except Exception as e:
-        print(f"\nCRITICAL ERROR: {e}")
+        print(f"\nCRITICAL ERROR: {e!r}")
         print("Please fix the errors above before using the MCP server.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()